@@ -16,7 +16,8 @@ class PostAdmin(admin.ModelAdmin):
     """Post admin configs"""
 
     empty_value_display = '-пусто-'
-    list_display = ('title', 'category', 'author', 'is_published')
+    list_display = ('title', 'category', 'author', 'is_published',
+                    'is_visible', 'comment_count')
     list_editable = ('is_published',)
     list_filter = ('created_at', 'location', 'author', 'location')
     search_fields = ('title', 'author', 'location')
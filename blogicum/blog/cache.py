@@ -0,0 +1,81 @@
+"""Generation based cache of the pages for anonymous visitors.
+
+Every cached page key includes the current values of the generation
+counters the page depends on. Bumping a counter makes all the pages
+built on its previous value unreachable, so nothing has to be deleted.
+Counter values are the time of the last change in nanoseconds, so they
+double as Last-Modified of the pages. Counters are kept in the 'shared'
+cache: a bump made by one worker process is seen by all the others,
+while the pages themselves may stay in the cache of each process.
+"""
+import hashlib
+import time
+from typing import Iterable, List
+
+from django.core.cache import caches
+from django.http import HttpRequest
+
+from .models import Post
+
+GLOBAL_GENERATION = 'global'
+FEED_GENERATION = 'feed'
+GENERATIONS_CACHE = 'shared'
+
+
+def _generation_key(name: str) -> str:
+    return f'blog:generation:{name}'
+
+
+def category_generation(slug: str) -> str:
+    """Name of the counter for pages of the category"""
+    return f'category:{slug}'
+
+
+def author_generation(username: str) -> str:
+    """Name of the counter for pages of the author"""
+    return f'author:{username}'
+
+
+def post_generation(post_id: int) -> str:
+    """Name of the counter for the page of the post"""
+    return f'post:{post_id}'
+
+
+def post_generations(post_id: int) -> List[str]:
+    """Counters of the pages showing the post"""
+    generations = [FEED_GENERATION, post_generation(post_id)]
+    for slug, username in Post.objects.filter(pk=post_id).values_list(
+            'category__slug', 'author__username'):
+        if slug:
+            generations.append(category_generation(slug))
+        generations.append(author_generation(username))
+    return generations
+
+
+def get_generations(names: Iterable[str]) -> List[int]:
+    """Return current values of the counters, creating missing ones.
+    A missing counter starts from the current time, so an evicted one
+    never comes back with a value some stale page was stored under.
+    """
+    cache = caches[GENERATIONS_CACHE]
+    keys = [_generation_key(name) for name in names]
+    values = cache.get_many(keys)
+    for key in keys:
+        if key not in values:
+            cache.add(key, time.time_ns(), None)
+            values[key] = cache.get(key)
+    return [values[key] for key in keys]
+
+
+def bump_generations(*names: str) -> None:
+    """Invalidate every page depending on any of the counters"""
+    now = time.time_ns()
+    caches[GENERATIONS_CACHE].set_many(
+        {_generation_key(name): now for name in names}, None)
+
+
+def page_cache_key(request: HttpRequest, generations: List[str]) -> str:
+    """Key of the page built from its URL and counters it depends on"""
+    values = get_generations([GLOBAL_GENERATION, *generations])
+    url = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    return f'blog:page:{url}:' + '.'.join(map(str, values))
@@ -1,16 +1,55 @@
+from typing import Any, Optional
+
 from django import forms
+from django.core.exceptions import ValidationError
 
-from .models import Post, Comment
+from .models import ChunkedUpload, Post, Comment
+from .uploads import UploadedChunks
+from core.fields import LimitedImageField
 
 
 class PostForm(forms.ModelForm):
-    """Model Form for post creating with datetime picker"""
+    """Model Form for post creating with datetime picker.
+    The image may come with the form or be uploaded in chunks beforehand
+    and attached by the token of the upload, see `blog.uploads`.
+    """
+
+    upload = forms.CharField(required=False, widget=forms.HiddenInput)
 
     class Meta:
         model = Post
         widgets = {'pub_date': forms.DateTimeInput(
             attrs={'type': 'datetime-local'})}
         exclude = ('author', 'comments', 'is_published')
+        field_classes = {'image': LimitedImageField}
+
+    def __init__(self, *args, user=None, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.user = user
+        self.upload: Optional[ChunkedUpload] = None
+
+    def clean(self) -> dict[str, Any]:
+        """Use the finished upload of the user as the image"""
+        cleaned_data = super().clean()
+        token = cleaned_data.get('upload')
+        if not token:
+            return cleaned_data
+        try:
+            self.upload = ChunkedUpload.objects.filter(
+                pk=token, user__pk=getattr(self.user, 'pk', None),
+                is_complete=True).first()
+        except ValidationError:
+            # not even a UUID
+            self.upload = None
+        if self.upload is None:
+            self.add_error('upload', 'Загрузка не найдена или не завершена')
+            return cleaned_data
+        try:
+            cleaned_data['image'] = self.fields['image'].clean(
+                UploadedChunks(self.upload))
+        except forms.ValidationError as error:
+            self.add_error('image', error)
+        return cleaned_data
 
 
 class CommentsForm(forms.ModelForm):
@@ -0,0 +1,168 @@
+"""Derived copies of post images.
+
+After a post with a new image is committed, its card and detail sized
+copies in JPEG and WebP are rendered by a bounded pool of worker
+processes. Names and dimensions of ready copies are stored in
+`Post.image_variants`; until then templates fall back to the original.
+"""
+import logging
+import multiprocessing
+import os
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Dict, Optional, Tuple
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.images import get_image_dimensions
+from django.core.files.storage import default_storage
+from django.db import connection, transaction
+from django.db.models import QuerySet
+
+from .cache import bump_generations, post_generations
+from .models import Post
+from core.constants import (IMAGE_VARIANT_FORMATS, IMAGE_VARIANT_QUALITY,
+                            IMAGE_VARIANTS, IMAGE_WORKERS)
+from core.imaging import render_variants
+
+logger = logging.getLogger(__name__)
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        # spawned workers do not inherit threads and DB connections
+        _executor = ProcessPoolExecutor(
+            max_workers=IMAGE_WORKERS,
+            mp_context=multiprocessing.get_context('spawn'))
+    return _executor
+
+
+def variant_names(image_name: str) -> Dict[str, Dict[str, str]]:
+    """Storage names of every copy: {variant: {PIL format: name}}"""
+    directory, filename = os.path.split(image_name)
+    stem = os.path.splitext(filename)[0]
+    return {
+        variant: {
+            image_format: os.path.join(directory, 'variants',
+                                       f'{stem}_{variant}.{extension}')
+            for image_format, extension in IMAGE_VARIANT_FORMATS.items()
+        }
+        for variant in IMAGE_VARIANTS
+    }
+
+
+def image_dimensions(image: File) -> Tuple[Optional[int], Optional[int]]:
+    """Read width and height from the image header, (None, None) when
+    there is no image or it can not be read
+    """
+    if not image:
+        return None, None
+    try:
+        return get_image_dimensions(image, close=image.closed)
+    except OSError:
+        logger.warning('Не удалось прочитать размеры изображения %s',
+                       image.name)
+        return None, None
+
+
+def image_posts(name: str) -> QuerySet:
+    """Posts showing the stored image `name` or its copy"""
+    directory, filename = os.path.split(name)
+    if os.path.basename(directory) != 'variants':
+        return Post.objects.filter(image=name)
+    stem = filename.rsplit('_', 1)[0]
+    prefix = os.path.join(os.path.dirname(directory), stem) + '.'
+    # extension of the original is unknown; unlike LIKE, the range of
+    # names starting with the prefix is looked up in the index
+    return Post.objects.filter(image__gte=prefix,
+                               image__lt=prefix[:-1] + '/')
+
+
+def delete_variants(variants: dict) -> None:
+    """Remove files of the stored variants"""
+    for variant in variants.values():
+        for image_format in IMAGE_VARIANT_FORMATS:
+            if variant.get(image_format):
+                default_storage.delete(variant[image_format])
+
+
+def release_image(name: str, variants: dict) -> None:
+    """Drop the reference of a post to its image. Identical images are
+    shared by posts (see `blog.storage`), so are their copies: they are
+    removed along with the image file only.
+    """
+    if not name:
+        return
+    default_storage.delete(name)
+
+    def delete_orphan_variants() -> None:
+        if not default_storage.exists(name):
+            delete_variants(variants)
+
+    transaction.on_commit(delete_orphan_variants)
+
+
+def _store_variants(post_id: int, image_name: str, names: dict,
+                    dimensions: dict) -> None:
+    variants = {
+        variant: {**names[variant], 'width': width, 'height': height}
+        for variant, (width, height) in dimensions.items()
+    }
+    # the image might have been replaced while the copies were rendered
+    if Post.objects.filter(pk=post_id, image=image_name).update(
+            image_variants=variants):
+        generations = post_generations(post_id)
+        transaction.on_commit(lambda: bump_generations(*generations))
+
+
+def _on_rendered(post_id: int, image_name: str, names: dict,
+                 future: Future) -> None:
+    try:
+        _store_variants(post_id, image_name, names, future.result())
+    except Exception:
+        logger.exception('Не удалось подготовить изображения поста %s',
+                         post_id)
+    finally:
+        connection.close()
+
+
+def schedule_variants(post: Post) -> None:
+    """Render copies of the post image after the current transaction,
+    or reuse the copies of the same image of another post. Runs in
+    place when `BLOG_BACKGROUND_TASKS` setting is off.
+    """
+    image_name = post.image.name
+    shared = Post.objects.filter(image=image_name).exclude(
+        pk=post.pk).exclude(image_variants={}).values_list(
+            'image_variants', flat=True).first()
+    if shared:
+        # an identical image has been uploaded and rendered already
+        Post.objects.filter(pk=post.pk).update(image_variants=shared)
+        post.image_variants = shared
+        return
+    names = variant_names(image_name)
+    targets = {
+        variant: {image_format: default_storage.path(name)
+                  for image_format, name in formats.items()}
+        for variant, formats in names.items()
+    }
+    args = (default_storage.path(image_name), targets, IMAGE_VARIANTS,
+            IMAGE_VARIANT_QUALITY)
+    if not getattr(settings, 'BLOG_BACKGROUND_TASKS', True):
+        # failures are only logged, as they are in the background
+        try:
+            _store_variants(post.pk, image_name, names,
+                            render_variants(*args))
+        except Exception:
+            logger.exception('Не удалось подготовить изображения поста %s',
+                             post.pk)
+        return
+
+    def submit() -> None:
+        future = _get_executor().submit(render_variants, *args)
+        future.add_done_callback(
+            lambda done: _on_rendered(post.pk, image_name, names, done))
+
+    transaction.on_commit(submit)
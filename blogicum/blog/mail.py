@@ -0,0 +1,126 @@
+"""Queued e-mail delivery.
+
+`QueuedEmailBackend` stores messages in the `QueuedEmail` table within
+the request transaction and returns at once. The `send_queued_mail`
+command drains the table in batches through EMAIL_DELIVERY_BACKEND
+over a single connection: one SMTP session, or with the file-based
+backend one spool file per run instead of a file per message. A batch
+is claimed for EMAIL_CLAIM_TIMEOUT seconds in a short transaction, so
+no transaction stays open while the messages travel over the network,
+and messages of a worker which died are delivered once the claim ends.
+"""
+import email
+import logging
+from datetime import timedelta
+from typing import List, Tuple
+
+from django.conf import settings
+from django.core.mail import get_connection
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.mail.message import MIMEMixin
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import QueuedEmail
+from core.constants import EMAIL_CLAIM_TIMEOUT, EMAIL_MAX_ATTEMPTS
+from core.db import retry_on_lock
+
+logger = logging.getLogger(__name__)
+
+
+class QueuedEmailBackend(BaseEmailBackend):
+    """Backend putting messages into the delivery queue"""
+
+    def send_messages(self, email_messages) -> int:
+        """Enqueue messages having recipients"""
+        queued = [
+            QueuedEmail(from_email=message.from_email,
+                        recipients=message.recipients(),
+                        message=message.message().as_bytes())
+            for message in email_messages if message.recipients()
+        ]
+        QueuedEmail.objects.bulk_create(queued)
+        return len(queued)
+
+
+class SpooledMIME(MIMEMixin, email.message.Message):
+    """Parsed message serialized with the line separator delivery
+    backends ask for, as Django's own MIME classes are
+    """
+
+
+class SpooledMessage:
+    """Queued message in the shape delivery backends expect"""
+
+    encoding = None
+
+    def __init__(self, queued: QueuedEmail) -> None:
+        self.from_email = queued.from_email
+        self._recipients = queued.recipients
+        self._message = bytes(queued.message)
+
+    def recipients(self) -> List[str]:
+        return self._recipients
+
+    def message(self) -> SpooledMIME:
+        return email.message_from_bytes(self._message, _class=SpooledMIME)
+
+
+def pending_emails():
+    """Messages still to be delivered and not claimed by a worker"""
+    return QueuedEmail.objects.filter(
+        Q(claimed_until__isnull=True) | Q(claimed_until__lt=timezone.now()),
+        attempts__lt=EMAIL_MAX_ATTEMPTS)
+
+
+@retry_on_lock
+def claim_batch(after: int, batch_size: int) -> List[QueuedEmail]:
+    """Claim pending messages following `after` for this worker"""
+    batch = list(pending_emails().filter(pk__gt=after)
+                 .select_for_update(skip_locked=True)[:batch_size])
+    QueuedEmail.objects.filter(pk__in=[queued.pk for queued in batch]).update(
+        claimed_until=timezone.now() + timedelta(seconds=EMAIL_CLAIM_TIMEOUT))
+    return batch
+
+
+def _deliver_batch(connection, after: int,
+                   batch_size: int) -> Tuple[int, int, int]:
+    """Deliver claimed messages following `after` one by one over the
+    open connection. Delivered ones leave the queue, failed ones count
+    the attempt and are released. Return (sent, failed, last pk).
+    """
+    batch = claim_batch(after, batch_size)
+    sent, failed = [], []
+    for queued in batch:
+        try:
+            connection.send_messages([SpooledMessage(queued)])
+        except Exception as error:
+            logger.warning('Не удалось отправить письмо %s: %s',
+                           queued.pk, error)
+            queued.attempts += 1
+            queued.last_error = f'{type(error).__name__}: {error}'
+            queued.claimed_until = None
+            failed.append(queued)
+        else:
+            sent.append(queued.pk)
+    with transaction.atomic():
+        QueuedEmail.objects.filter(pk__in=sent).delete()
+        QueuedEmail.objects.bulk_update(
+            failed, ('attempts', 'last_error', 'claimed_until'))
+    return len(sent), len(failed), batch[-1].pk if batch else after
+
+
+def send_queued(batch_size: int) -> Tuple[int, int]:
+    """Try every pending message once; return (sent, failed)"""
+    if not pending_emails().exists():
+        return 0, 0
+    sent = failed = last_pk = 0
+    with get_connection(settings.EMAIL_DELIVERY_BACKEND) as connection:
+        while True:
+            batch_sent, batch_failed, last_pk = _deliver_batch(
+                connection, last_pk, batch_size)
+            sent += batch_sent
+            failed += batch_failed
+            if batch_sent + batch_failed < batch_size:
+                return sent, failed
@@ -0,0 +1,152 @@
+import asyncio
+import importlib
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from itertools import cycle, islice
+from typing import List
+
+from django.conf import settings
+from django.core.asgi import get_asgi_application
+from django.core.management.base import BaseCommand, CommandError
+from django.core.wsgi import get_wsgi_application
+from django.test import RequestFactory, override_settings
+from django.urls import clear_url_caches
+
+from blog.cache import GLOBAL_GENERATION, bump_generations
+from blog.models import Post
+from core.helpers import filter_queryset, local_host
+
+
+class Command(BaseCommand):
+    """Compare throughput of the public read pages served by the WSGI
+    and the ASGI handler in this process, on the data of the current
+    database. WSGI requests are handled by a fixed number of threads
+    as a threaded WSGI server does; under ASGI every client gets its own
+    task. `--client-delay` imitates a slow client receiving the page.
+    The read views are built for each handler as its entry point builds
+    them, see `blog.mixins.AsyncViewMixin`.
+    """
+
+    help = 'Сравнивает пропускную способность WSGI и ASGI'
+
+    def add_arguments(self, parser) -> None:
+        """Register command options"""
+        parser.add_argument('--requests', type=int, default=200,
+                            help='Количество запросов к каждому серверу')
+        parser.add_argument('--clients', type=int, default=50,
+                            help='Одновременных клиентов')
+        parser.add_argument('--threads', type=int, default=8,
+                            help='Потоков WSGI-сервера')
+        parser.add_argument('--client-delay', type=float, default=0.05,
+                            help='Время получения страницы клиентом, с')
+        parser.add_argument('--cached', action='store_true',
+                            help='Не сбрасывать кэш страниц')
+
+    def get_paths(self) -> List[str]:
+        """Index, detail, category and profile pages of a visible post"""
+        post = filter_queryset(Post.objects).first()
+        if post is None:
+            raise CommandError('Нет опубликованных записей для проверки')
+        return ['/', f'/posts/{post.pk}/',
+                f'/category/{post.category.slug}/',
+                f'/profile/{post.author.username}/']
+
+    @contextmanager
+    def views(self, asgi: bool):
+        """Build the URLconf with the read views as coroutines or not"""
+        def rebuild() -> None:
+            for name in ('blog.urls', settings.ROOT_URLCONF):
+                importlib.reload(importlib.import_module(name))
+            clear_url_caches()
+
+        try:
+            with override_settings(BLOG_ASYNC_VIEWS=asgi):
+                rebuild()
+                yield
+        finally:
+            rebuild()
+
+    def run_wsgi(self, paths: List[str], threads: int, delay: float,
+                 cached: bool) -> Counter:
+        """Serve every path with the WSGI handler from a thread pool"""
+        application = get_wsgi_application()
+        host = local_host()
+        factory = RequestFactory(HTTP_HOST=host, SERVER_NAME=host)
+
+        def request(path: str) -> int:
+            statuses = []
+            if not cached:
+                bump_generations(GLOBAL_GENERATION)
+            body = application(
+                factory.get(path).environ,
+                lambda status, headers, exc_info=None: statuses.append(
+                    int(status.split()[0])))
+            try:
+                for _ in body:
+                    pass
+                time.sleep(delay)
+            finally:
+                body.close()
+            return statuses[0]
+
+        with ThreadPoolExecutor(threads) as executor:
+            return Counter(executor.map(request, paths))
+
+    async def run_asgi(self, paths: List[str], clients: int, delay: float,
+                       cached: bool) -> Counter:
+        """Serve every path with the ASGI handler, a task per client"""
+        application = get_asgi_application()
+        queue = iter(paths)
+        host = local_host()
+        statuses = Counter()
+
+        async def receive() -> dict:
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+        async def send(message: dict) -> None:
+            if message['type'] == 'http.response.start':
+                statuses[message['status']] += 1
+            elif not message.get('more_body'):
+                await asyncio.sleep(delay)
+
+        async def client() -> None:
+            for path in queue:
+                if not cached:
+                    bump_generations(GLOBAL_GENERATION)
+                scope = {
+                    'type': 'http', 'asgi': {'version': '3.0'},
+                    'http_version': '1.1', 'method': 'GET', 'scheme': 'http',
+                    'path': path, 'query_string': b'', 'root_path': '',
+                    'headers': [(b'host', host.encode())],
+                    'server': (host, 80), 'client': ('127.0.0.1', 0),
+                }
+                await application(scope, receive, send)
+
+        await asyncio.gather(*(client() for _ in range(clients)))
+        return statuses
+
+    def report(self, name: str, statuses: Counter, seconds: float) -> None:
+        """Print throughput of one handler"""
+        total = sum(statuses.values())
+        errors = total - statuses[200]
+        self.stdout.write(
+            f'{name}: запросов {total} за {seconds:.2f} с, '
+            f'{total / seconds:.1f} запр./с, ошибок: {errors}')
+
+    def handle(self, *args, requests: int, clients: int, threads: int,
+               client_delay: float, cached: bool, **options) -> None:
+        """Run the same requests through both handlers"""
+        paths = list(islice(cycle(self.get_paths()), requests))
+        with self.views(asgi=False):
+            started = time.perf_counter()
+            statuses = self.run_wsgi(paths, threads, client_delay, cached)
+            self.report(f'WSGI ({threads} потоков)', statuses,
+                        time.perf_counter() - started)
+        with self.views(asgi=True):
+            started = time.perf_counter()
+            statuses = asyncio.run(
+                self.run_asgi(paths, clients, client_delay, cached))
+            self.report(f'ASGI ({clients} клиентов)', statuses,
+                        time.perf_counter() - started)
@@ -0,0 +1,93 @@
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.http import HttpResponse
+from django.test import Client
+
+from blog.models import Post
+from core.helpers import filter_queryset, local_host
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    """Measure how many post pages readers get on the current database,
+    first alone and then while writers post comments through
+    `CommentCreateView`. The comments are deleted afterwards.
+    """
+
+    help = ('Измеряет чтение страниц при одновременной записи '
+            'комментариев')
+
+    def add_arguments(self, parser) -> None:
+        """Register command options"""
+        parser.add_argument('--seconds', type=float, default=5,
+                            help='Длительность каждого замера, с')
+        parser.add_argument('--readers', type=int, default=4,
+                            help='Читающих клиентов')
+        parser.add_argument('--writers', type=int, default=2,
+                            help='Пишущих комментарии клиентов')
+
+    def run_client(self, deadline: float, request: Callable[[Client],
+                   HttpResponse], user=None) -> Counter:
+        """Repeat the request until the deadline, count statuses"""
+        client = Client(raise_request_exception=False,
+                        HTTP_HOST=local_host())
+        if user is not None:
+            client.force_login(user)
+        statuses = Counter()
+        try:
+            while time.monotonic() < deadline:
+                statuses[request(client).status_code] += 1
+        finally:
+            connection.close()
+        return statuses
+
+    def measure(self, post: Post, writer, readers: int, writers: int,
+                seconds: float) -> None:
+        """Run readers and writers at once and report their rates"""
+        url = f'/posts/{post.pk}/'
+        deadline = time.monotonic() + seconds
+        with ThreadPoolExecutor(readers + writers) as executor:
+            reads = [executor.submit(self.run_client, deadline,
+                                     lambda client: client.get(url))
+                     for _ in range(readers)]
+            writes = [executor.submit(
+                self.run_client, deadline,
+                lambda client: client.post(f'{url}comment/',
+                                           {'text': 'Комментарий'}),
+                writer) for _ in range(writers)]
+            read = sum((future.result() for future in reads), Counter())
+            written = sum((future.result() for future in writes), Counter())
+        self.report(f'чтение ({readers})', read, 200, seconds)
+        if writers:
+            self.report(f'запись ({writers})', written, 302, seconds)
+
+    def report(self, name: str, statuses: Counter, success: int,
+               seconds: float) -> None:
+        """Print the rate of successful requests"""
+        errors = sum(statuses.values()) - statuses[success]
+        self.stdout.write(
+            f'  {name}: {statuses[success] / seconds:.1f} запр./с, '
+            f'ошибок: {errors}')
+
+    def handle(self, *args, seconds: float, readers: int, writers: int,
+               **options) -> None:
+        """Measure reads alone and along with writes"""
+        post = filter_queryset(Post.objects).first()
+        if post is None:
+            raise CommandError('Нет опубликованных записей для проверки')
+        writer = User.objects.create_user(f'bench-{uuid.uuid4().hex[:8]}')
+        try:
+            self.stdout.write('Без записи:')
+            self.measure(post, writer, readers, 0, seconds)
+            self.stdout.write('С записью комментариев:')
+            self.measure(post, writer, readers, writers, seconds)
+        finally:
+            writer.delete()
@@ -0,0 +1,63 @@
+import importlib
+from pathlib import Path
+from typing import List
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.core.management.base import BaseCommand, CommandError
+
+from core.constants import (CSS_CRITICAL_SOURCES, CSS_CRITICAL_TEMPLATE,
+                            CSS_PURGED, CSS_SCAN_PACKAGES, CSS_SOURCE)
+from core.css import collect_words, purge_css
+
+
+class Command(BaseCommand):
+    """Build the trimmed Bootstrap stylesheet linked by `base.html` and
+    the critical CSS it inlines. Run it after changing templates and
+    commit the results; `--check` fails when they are out of date.
+    """
+
+    help = ('Собирает таблицу стилей Bootstrap только с используемыми '
+            'правилами и критический CSS для base.html')
+
+    def add_arguments(self, parser) -> None:
+        """Register command options"""
+        parser.add_argument('--check', action='store_true',
+                            help='Только проверить, что файлы актуальны')
+
+    def template_dir(self) -> Path:
+        """Project templates directory"""
+        return Path(settings.TEMPLATES[0]['DIRS'][0])
+
+    def sources(self) -> List[Path]:
+        """Templates of the project and code of packages making markup"""
+        critical = self.template_dir() / CSS_CRITICAL_TEMPLATE
+        paths = [path for path in self.template_dir().rglob('*.html')]
+        for package in CSS_SCAN_PACKAGES:
+            root = Path(importlib.import_module(package).__file__).parent
+            paths += [*root.rglob('*.html'), *root.rglob('*.py')]
+        return [path for path in paths if path != critical]
+
+    def handle(self, *args, check: bool, **options) -> None:
+        """Write or compare both stylesheets"""
+        source = finders.find(CSS_SOURCE)
+        css = Path(source).read_text(encoding='utf-8')
+        outputs = {
+            Path(settings.STATICFILES_DIRS[0]) / CSS_PURGED:
+                purge_css(css, collect_words(self.sources())),
+            self.template_dir() / CSS_CRITICAL_TEMPLATE:
+                purge_css(css, collect_words(
+                    self.template_dir() / name
+                    for name in CSS_CRITICAL_SOURCES)),
+        }
+        stale = []
+        for path, content in outputs.items():
+            if path.exists() and path.read_text(encoding='utf-8') == content:
+                continue
+            stale.append(path)
+            if not check:
+                path.write_text(content, encoding='utf-8')
+            self.stdout.write(f'{path}: {len(css)} -> {len(content)} символов')
+        if check and stale:
+            raise CommandError('Таблицы стилей устарели, запустите '
+                               'build_css: ' + ', '.join(map(str, stale)))
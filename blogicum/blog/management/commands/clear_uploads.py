@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from blog.uploads import discard_upload, expired_uploads
+
+
+class Command(BaseCommand):
+    """Remove chunked uploads that were never finished or attached,
+    together with their temporary files. Meant to be run by cron.
+    """
+
+    help = 'Удаляет брошенные загрузки изображений'
+
+    def handle(self, *args, **options) -> None:
+        """Discard every expired upload"""
+        removed = 0
+        for upload in expired_uploads().iterator():
+            discard_upload(upload)
+            removed += 1
+        self.stdout.write(f'Удалено загрузок: {removed}')
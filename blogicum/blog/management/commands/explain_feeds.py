@@ -0,0 +1,71 @@
+import re
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from blog.mixins import KeysetPaginationMixin
+from blog.models import Post
+from core.constants import MAX_POSTS_COUNT
+from core.helpers import filter_queryset
+from core.paginator import KeysetPaginator
+
+# plan lines which mean a full table scan or a sort on the fly; an
+# ordered walk over an index ("SCAN table USING INDEX") is fine
+BAD_PLAN_MARKERS = {
+    'sqlite': re.compile(r'^(?!.*USING).*\bSCAN \w|USE TEMP B-TREE'),
+    'postgresql': re.compile(r'Seq Scan|Sort'),
+}
+
+
+class Command(BaseCommand):
+    """Run EXPLAIN on every list query built by `filter_queryset`
+    and fail if the database has to scan or sort instead of using
+    an index.
+    """
+
+    help = 'Проверяет планы запросов лент публикаций'
+
+    def get_feed_querysets(self) -> dict:
+        """Querysets of the list views: the first page and a deep one"""
+        feeds = {
+            'index': filter_queryset(Post.objects),
+            'category': filter_queryset(Post.objects.all(), category_id=1),
+            'profile': filter_queryset(Post.objects, author__id=1),
+            'own profile': filter_queryset(
+                Post.objects, author__id=1, valid_objects=False),
+        }
+        cursor_post = Post(pk=1, pub_date=timezone.now())
+        querysets = {}
+        for name, queryset in feeds.items():
+            paginator = KeysetPaginator(
+                queryset, MAX_POSTS_COUNT,
+                KeysetPaginationMixin.keyset_ordering)
+            cursor = paginator.encode_cursor(cursor_post)
+            querysets[name] = paginator.get_page_queryset()
+            querysets[f'{name} (after)'] = paginator.get_page_queryset(
+                after=cursor)
+        return querysets
+
+    def handle(self, *args, **options) -> None:
+        """Explain every feed query and report the bad plans"""
+        markers = BAD_PLAN_MARKERS.get(connection.vendor)
+        if markers is None:
+            raise CommandError(
+                f'Нет правил проверки для СУБД {connection.vendor}')
+        failed = []
+        for name, queryset in self.get_feed_querysets().items():
+            plan = queryset.explain()
+            bad_lines = [line for line in plan.splitlines()
+                         if markers.search(line)]
+            if bad_lines:
+                failed.append(name)
+                self.stdout.write(self.style.ERROR(f'{name}:'))
+                for line in bad_lines:
+                    self.stdout.write(f'    {line}')
+            else:
+                self.stdout.write(f'{name}: OK')
+        if failed:
+            raise CommandError(
+                f'Запросы без подходящего индекса: {", ".join(failed)}')
+        self.stdout.write(self.style.SUCCESS('Все планы используют индексы'))
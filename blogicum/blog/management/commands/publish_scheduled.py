@@ -0,0 +1,79 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Min
+from django.db.models.functions import Now
+from django.utils import timezone
+
+from blog.models import Post
+from blog.visibility import hide_stale_posts
+from core.constants import SCHEDULE_BATCH_SIZE, SCHEDULE_INTERVAL
+
+
+class Command(BaseCommand):
+    """Make scheduled posts visible once their publication date comes.
+    Every post is saved with `update_fields`, so `post_save` receivers
+    (page caches and the like) react the same way as to an edit. Posts
+    left visible in hidden categories, e.g. by a process stopped before
+    updating them, are hidden on every pass, see `blog.visibility`.
+    """
+
+    help = 'Публикует отложенные публикации, время которых наступило'
+
+    def add_arguments(self, parser) -> None:
+        """Register command options"""
+        parser.add_argument('--loop', action='store_true',
+                            help='Работать постоянно, как фоновый процесс')
+        parser.add_argument('--interval', type=int,
+                            default=SCHEDULE_INTERVAL,
+                            help='Наибольшая пауза между проверками, с')
+        parser.add_argument('--batch-size', type=int,
+                            default=SCHEDULE_BATCH_SIZE,
+                            help='Количество публикаций в одной транзакции')
+
+    def due_posts(self):
+        """Published posts whose date has come but still hidden"""
+        return Post.objects.filter(
+            is_published=True, is_visible=False, pub_date__lte=Now(),
+            category__is_published=True)
+
+    def publish_due(self, batch_size: int) -> int:
+        """Flip visibility of due posts batch by batch"""
+        published = 0
+        while True:
+            with transaction.atomic():
+                batch = list(self.due_posts().select_related(
+                    'author', 'category').select_for_update()
+                    .order_by('pub_date')[:batch_size])
+                for post in batch:
+                    post.save(update_fields=('is_visible',))
+            published += len(batch)
+            if len(batch) < batch_size:
+                return published
+
+    def seconds_to_next(self, interval: int) -> float:
+        """Sleep until the nearest scheduled post but not longer than
+        `interval`
+        """
+        next_pub_date = Post.objects.filter(
+            is_published=True, is_visible=False, pub_date__gt=Now()
+        ).aggregate(next=Min('pub_date'))['next']
+        if next_pub_date is None:
+            return interval
+        seconds = (next_pub_date - timezone.now()).total_seconds()
+        return min(interval, max(seconds, 0))
+
+    def handle(self, *args, loop: bool, interval: int, batch_size: int,
+               **options) -> None:
+        """Publish due posts once or keep doing it forever"""
+        while True:
+            hidden = hide_stale_posts(batch_size)
+            if hidden:
+                self.stdout.write(f'Скрыто записей: {hidden}')
+            published = self.publish_due(batch_size)
+            if published:
+                self.stdout.write(f'Опубликовано записей: {published}')
+            if not loop:
+                return
+            time.sleep(self.seconds_to_next(interval))
@@ -0,0 +1,45 @@
+from importlib import import_module
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from core.constants import SESSION_CLEANUP_BATCH_SIZE
+from core.db import retry_on_lock
+
+
+class Command(BaseCommand):
+    """Delete expired sessions from the database batch by batch: unlike
+    `clearsessions` it never holds the write lock for long. Meant to be
+    run by cron.
+    """
+
+    help = 'Удаляет истёкшие сессии частями'
+
+    def add_arguments(self, parser) -> None:
+        """Register command options"""
+        parser.add_argument('--batch-size', type=int,
+                            default=SESSION_CLEANUP_BATCH_SIZE,
+                            help='Количество сессий в одной транзакции')
+
+    def handle(self, *args, batch_size: int, **options) -> None:
+        """Delete batches until no expired session is left"""
+        store = import_module(settings.SESSION_ENGINE).SessionStore
+        if not hasattr(store, 'get_model_class'):
+            self.stdout.write('Сессии не хранятся в базе данных')
+            return
+        expired = store.get_model_class().objects.filter(
+            expire_date__lt=timezone.now())
+
+        @retry_on_lock
+        def delete_batch() -> int:
+            keys = list(expired.values_list('pk', flat=True)[:batch_size])
+            return expired.filter(pk__in=keys).delete()[0]
+
+        deleted = 0
+        while True:
+            batch = delete_batch()
+            deleted += batch
+            if batch < batch_size:
+                break
+        self.stdout.write(f'Удалено сессий: {deleted}')
@@ -0,0 +1,54 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from blog.models import Post, Comment
+from core.constants import RECOUNT_CHUNK_SIZE
+
+
+class Command(BaseCommand):
+    """Recompute `Post.comment_count` and repair the stale counters.
+    Posts are walked by primary key in chunks, so the command can run
+    on a live database without locking the whole table.
+    """
+
+    help = 'Пересчитывает счётчики комментариев у публикаций'
+
+    def add_arguments(self, parser) -> None:
+        """Register command options"""
+        parser.add_argument('--chunk-size', type=int,
+                            default=RECOUNT_CHUNK_SIZE,
+                            help='Количество публикаций в одной порции')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Только показать устаревшие счётчики')
+
+    def handle(self, *args, chunk_size: int, dry_run: bool,
+               **options) -> None:
+        """Walk posts chunk by chunk and fix mismatched counters"""
+        actual_count = Coalesce(Subquery(
+            Comment.objects.filter(post=OuterRef('pk')).order_by()
+            .values('post').annotate(total=Count('pk')).values('total')
+        ), 0)
+        last_pk, checked, repaired = 0, 0, 0
+        while True:
+            chunk = list(
+                Post.objects.filter(pk__gt=last_pk).order_by('pk')
+                .annotate(actual=actual_count)
+                .values_list('pk', 'comment_count', 'actual')[:chunk_size]
+            )
+            if not chunk:
+                break
+            last_pk = chunk[-1][0]
+            checked += len(chunk)
+            stale = [pk for pk, stored, actual in chunk if stored != actual]
+            if stale and not dry_run:
+                # counting again inside UPDATE keeps concurrent comments safe
+                with transaction.atomic():
+                    Post.objects.filter(pk__in=stale).update(
+                        comment_count=actual_count)
+            repaired += len(stale)
+        verb = 'Найдено' if dry_run else 'Исправлено'
+        self.stdout.write(self.style.SUCCESS(
+            f'Проверено публикаций: {checked}. '
+            f'{verb} счётчиков: {repaired}.'))
@@ -0,0 +1,38 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from blog.mail import send_queued
+from core.constants import EMAIL_BATCH_SIZE, EMAIL_QUEUE_INTERVAL
+
+
+class Command(BaseCommand):
+    """Deliver e-mail queued by `blog.mail.QueuedEmailBackend`. Run it
+    with `--loop` as a worker process or by cron without it.
+    """
+
+    help = 'Отправляет письма из очереди'
+
+    def add_arguments(self, parser) -> None:
+        """Register command options"""
+        parser.add_argument('--loop', action='store_true',
+                            help='Работать постоянно, как фоновый процесс')
+        parser.add_argument('--interval', type=int,
+                            default=EMAIL_QUEUE_INTERVAL,
+                            help='Пауза, когда очередь пуста, с')
+        parser.add_argument('--batch-size', type=int,
+                            default=EMAIL_BATCH_SIZE,
+                            help='Количество писем, занимаемых за один раз')
+
+    def handle(self, *args, loop: bool, interval: int, batch_size: int,
+               **options) -> None:
+        """Drain the queue once or keep doing it forever"""
+        while True:
+            sent, failed = send_queued(batch_size)
+            if sent or failed:
+                self.stdout.write(
+                    f'Отправлено писем: {sent}, с ошибкой: {failed}')
+            if not loop:
+                return
+            if not sent:
+                time.sleep(interval)
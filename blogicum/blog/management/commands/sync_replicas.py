@@ -0,0 +1,39 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from core.constants import REPLICA_SYNC_INTERVAL
+from core.replicas import copy_sqlite
+
+
+class Command(BaseCommand):
+    """Replication stand-in for local SQLite replicas (DB_REPLICAS):
+    copy the primary database into every replica file. Other databases
+    have replication of their own.
+    """
+
+    help = 'Копирует основную базу SQLite в файлы реплик'
+
+    def add_arguments(self, parser) -> None:
+        """Register command options"""
+        parser.add_argument('--loop', action='store_true',
+                            help='Работать постоянно, как фоновый процесс')
+        parser.add_argument('--interval', type=float,
+                            default=REPLICA_SYNC_INTERVAL,
+                            help='Пауза между копированиями, с')
+
+    def handle(self, *args, loop: bool, interval: float, **options) -> None:
+        """Copy the primary once or keep doing it forever"""
+        if not settings.DATABASE_REPLICAS:
+            raise CommandError('Реплики не настроены, см. DB_REPLICAS')
+        if connections[DEFAULT_DB_ALIAS].vendor != 'sqlite':
+            raise CommandError('Команда нужна только для реплик SQLite')
+        source = settings.DATABASES[DEFAULT_DB_ALIAS]['NAME']
+        while True:
+            for alias in settings.DATABASE_REPLICAS:
+                copy_sqlite(source, settings.DATABASES[alias]['NAME'])
+            if not loop:
+                return
+            time.sleep(interval)
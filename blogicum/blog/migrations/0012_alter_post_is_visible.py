@@ -0,0 +1,29 @@
+# Generated by Django 3.2.16 on 2026-10-17 04:39
+
+from django.db import migrations, models
+from django.db.models import Q
+
+
+def hide_posts_of_unpublished_categories(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    Post.objects.filter(
+        Q(category__isnull=True) | Q(category__is_published=False),
+        is_visible=True,
+    ).update(is_visible=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0011_post_is_visible'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='post',
+            name='is_visible',
+            field=models.BooleanField(default=False, editable=False, help_text='Опубликован, дата публикации наступила и категория опубликована; для отложенных публикаций выставляется командой publish_scheduled.', verbose_name='Виден на сайте'),
+        ),
+        migrations.RunPython(hide_posts_of_unpublished_categories,
+                             migrations.RunPython.noop),
+    ]
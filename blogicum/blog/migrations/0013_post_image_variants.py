@@ -0,0 +1,18 @@
+# Generated by Django 3.2.16 on 2026-10-17 04:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0012_alter_post_is_visible'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='image_variants',
+            field=models.JSONField(default=dict, editable=False, help_text='Заполняется после обработки изображения, см. blog.images.', verbose_name='Уменьшенные копии изображения'),
+        ),
+    ]
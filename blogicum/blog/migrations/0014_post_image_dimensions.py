@@ -0,0 +1,37 @@
+# Generated by Django 3.2.16 on 2026-10-17 04:44
+
+from django.core.files.images import get_image_dimensions
+from django.db import migrations, models
+
+
+def fill_image_dimensions(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    posts = Post.objects.exclude(image='').exclude(image=None)
+    for post in posts.only('image').iterator():
+        try:
+            width, height = get_image_dimensions(post.image, close=True)
+        except OSError:
+            continue
+        Post.objects.filter(pk=post.pk).update(image_width=width,
+                                               image_height=height)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0013_post_image_variants'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='image_height',
+            field=models.PositiveIntegerField(editable=False, help_text='Заполняется при сохранении нового изображения.', null=True, verbose_name='Высота изображения'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='image_width',
+            field=models.PositiveIntegerField(editable=False, help_text='Заполняется при сохранении нового изображения.', null=True, verbose_name='Ширина изображения'),
+        ),
+        migrations.RunPython(fill_image_dimensions, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 3.2.16 on 2026-10-17 04:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0014_post_image_dimensions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StoredFile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=256, unique=True, verbose_name='Имя файла')),
+                ('ref_count', models.PositiveIntegerField(default=0, help_text='Файл удаляется, когда на него не остаётся ссылок.', verbose_name='Количество ссылок')),
+            ],
+            options={
+                'verbose_name': 'файл',
+                'verbose_name_plural': 'Файлы',
+            },
+        ),
+    ]
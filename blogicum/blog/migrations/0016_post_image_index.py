@@ -0,0 +1,18 @@
+# Generated by Django 3.2.16 on 2026-10-17 04:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0015_storedfile'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='post',
+            name='image',
+            field=models.ImageField(blank=True, db_index=True, null=True, upload_to='uploads/post_covers', verbose_name='Изображение к публикации'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 3.2.16 on 2026-10-17 04:51
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('blog', '0016_post_image_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChunkedUpload',
+            fields=[
+                ('token', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('filename', models.CharField(max_length=256, verbose_name='Имя файла')),
+                ('size', models.PositiveBigIntegerField(verbose_name='Размер, байт')),
+                ('checksum', models.CharField(max_length=64, verbose_name='Контрольная сумма SHA-256')),
+                ('received', models.PositiveBigIntegerField(default=0, verbose_name='Получено, байт')),
+                ('is_complete', models.BooleanField(default=False, verbose_name='Загрузка завершена')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Начата')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='uploads', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+            ],
+            options={
+                'verbose_name': 'загрузка',
+                'verbose_name_plural': 'Загрузки',
+            },
+        ),
+    ]
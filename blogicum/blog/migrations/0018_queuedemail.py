@@ -0,0 +1,30 @@
+# Generated by Django 3.2.16 on 2026-10-17 05:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0017_chunkedupload'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QueuedEmail',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('from_email', models.CharField(max_length=256, verbose_name='Отправитель')),
+                ('recipients', models.JSONField(verbose_name='Получатели')),
+                ('message', models.BinaryField(verbose_name='Сообщение в формате MIME')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='Неудачных попыток отправки')),
+                ('last_error', models.TextField(blank=True, verbose_name='Последняя ошибка')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Добавлено')),
+            ],
+            options={
+                'verbose_name': 'письмо в очереди',
+                'verbose_name_plural': 'Очередь писем',
+                'ordering': ('pk',),
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 3.2.16 on 2026-10-17 12:10
+
+from django.db import migrations
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def recount_comment_count(apps, schema_editor):
+    """Counters went stale on cascade and bulk deletions before they
+    were kept by signal receivers
+    """
+    Post = apps.get_model('blog', 'Post')
+    Comment = apps.get_model('blog', 'Comment')
+    Post.objects.update(comment_count=Coalesce(Subquery(
+        Comment.objects.filter(post=OuterRef('pk')).order_by()
+        .values('post').annotate(total=Count('pk')).values('total')
+    ), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0018_queuedemail'),
+    ]
+
+    operations = [
+        migrations.RunPython(recount_comment_count,
+                             migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.16 on 2026-10-17 05:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0019_recount_comment_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='queuedemail',
+            name='claimed_until',
+            field=models.DateTimeField(blank=True, editable=False, help_text='Письмо отправляет send_queued_mail; после этого времени его может взять другой процесс.', null=True, verbose_name='Отправляется до'),
+        ),
+    ]
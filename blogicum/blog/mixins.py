@@ -1,12 +1,31 @@
-from typing import Any
+import hashlib
+from functools import wraps
+from typing import Any, Tuple
 
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.core.cache import cache
+from django.db import close_old_connections
 from django.db.models.base import Model
 from django.shortcuts import get_object_or_404
 from django.urls import reverse
-from django.http import Http404
+from django.db.models import Q
+from django.http import Http404, HttpResponse
+from django.template.response import SimpleTemplateResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.decorators import classonlymethod
+from django.utils.http import http_date, quote_etag
 
+from blog.cache import GLOBAL_GENERATION, get_generations, page_cache_key
+from blog.forms import PostForm
 from blog.models import Post, Comment
+from blog.uploads import discard_upload
+from core.constants import PAGE_CACHE_TIMEOUT
+from core.db import expire_health_checks, retry_on_lock
+from core.replicas import PRIMARY_COOKIE, replica_reads
+from core.helpers import published_query
+from core.paginator import InvalidCursor, KeysetPaginator
 
 
 class SuccessURLMixin:
@@ -27,14 +46,80 @@ class PostViewMixin:
         """Return 'True' if current user is author of the obj, 'False'
         otherwise
         """
-        return self.request.user == obj.author
+        return obj.author_id == self.request.user.pk
+
+    def get_visible_post(self) -> Post:
+        """Get post with its relations in one query if it is published
+        or the current user is its author
+        """
+        query = published_query()
+        if self.request.user.is_authenticated:
+            query |= Q(author=self.request.user)
+        queryset = Post.objects.select_related(
+            'category', 'location', 'author').filter(query)
+        try:
+            return queryset.get(pk=self.kwargs[self.pk_url_kwarg])
+        except Post.DoesNotExist:
+            raise Http404("Пост не найден, или недоступен")
 
     def get_success_url(self) -> str:
         """Default url to be reversed"""
         return reverse("blog:profile", args=[self.request.user.username])
 
 
-class CommentViewMixin(LoginRequiredMixin, SuccessURLMixin):
+class PostFormMixin:
+    """Give `PostForm` the current user and drop the chunked upload
+    attached to the form once the post is saved
+    """
+
+    form_class = PostForm
+
+    def get_form_kwargs(self) -> dict[str, Any]:
+        """Owner of the attached upload must be the current user"""
+        kwargs = super().get_form_kwargs()
+        kwargs['user'] = self.request.user
+        return kwargs
+
+    def form_valid(self, form) -> HttpResponse:
+        """Remove the upload after its file has been moved to storage"""
+        response = super().form_valid(form)
+        if form.upload is not None:
+            form.cleaned_data['image'].close()
+            discard_upload(form.upload)
+        return response
+
+
+class ReplicaReadMixin:
+    """Read the page from a replica, see `core.replicas`, unless the
+    client has just written and must see its changes
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        """Build and render the page within `replica_reads()`"""
+        if (request.method not in ('GET', 'HEAD')
+                or PRIMARY_COOKIE in request.COOKIES):
+            return super().dispatch(request, *args, **kwargs)
+        with replica_reads():
+            response = super().dispatch(request, *args, **kwargs)
+            # lazy querysets are evaluated by the template
+            if isinstance(response, SimpleTemplateResponse):
+                response.render()
+        return response
+
+
+class LockRetryMixin:
+    """Handle write requests in one transaction which is rerun while
+    SQLite reports the database is locked, see `core.db`
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        """Retry everything the request writes as a whole"""
+        if request.method in ('GET', 'HEAD', 'OPTIONS'):
+            return super().dispatch(request, *args, **kwargs)
+        return retry_on_lock(super().dispatch)(request, *args, **kwargs)
+
+
+class CommentViewMixin(LoginRequiredMixin, LockRetryMixin, SuccessURLMixin):
     """Base set of views for comment handling"""
 
     model = Comment
@@ -54,6 +139,151 @@ class CommentViewMixin(LoginRequiredMixin, SuccessURLMixin):
         """
         queryset = self.get_queryset()
         obj = get_object_or_404(queryset, pk=self.kwargs["comment_pk"])
-        if obj.author == self.request.user:
+        if obj.author_id == self.request.user.pk:
             return obj
         raise Http404("Вам нельзя редактировать не свои комментарии")
+
+
+class KeysetPaginationMixin:
+    """Replace OFFSET pagination of a ListView with keyset pagination.
+    Pages are addressed with `?after=<cursor>` / `?before=<cursor>`
+    instead of `?page=N`, so deep pages cost the same as the first one.
+    """
+
+    keyset_ordering = ('-pub_date', 'id')
+
+    def paginate_queryset(self, queryset, page_size) -> tuple:
+        """Return the same tuple as `MultipleObjectMixin` does"""
+        paginator = KeysetPaginator(queryset, page_size,
+                                    self.keyset_ordering)
+        try:
+            page = paginator.page(after=self.request.GET.get('after'),
+                                  before=self.request.GET.get('before'))
+        except InvalidCursor:
+            raise Http404("Неверный курсор страницы")
+        return paginator, page, page.object_list, page.has_other_pages()
+
+
+class AnonymousPageCacheMixin:
+    """Serve GET requests of anonymous visitors from the page cache.
+    Views name the generation counter of the page in
+    `get_page_generation()`; bumping it (see `blog.signals`) makes the
+    cached page stale.
+    """
+
+    def get_page_generation(self) -> str:
+        """Return generation counter name of the page"""
+        raise NotImplementedError
+
+    def dispatch(self, request, *args, **kwargs):
+        """Return cached page or cache the rendered one"""
+        if (request.method not in ('GET', 'HEAD')
+                or request.user.is_authenticated):
+            return super().dispatch(request, *args, **kwargs)
+        key = page_cache_key(request, [self.get_page_generation()])
+        response = cache.get(key)
+        if response is not None:
+            return response
+        response = super().dispatch(request, *args, **kwargs)
+        if response.status_code == 200:
+            response.add_post_render_callback(
+                lambda rendered: cache.set(key, rendered,
+                                           PAGE_CACHE_TIMEOUT))
+        return response
+
+
+class ConditionalGetMixin:
+    """Answer 304 Not Modified without running any query.
+    Validators are built from the generation counters of the page (see
+    `blog.cache`) named by `get_page_generation()`. The counters hold
+    the time of the last change, so they give Last-Modified as well.
+    They live in the cache shared by all worker processes: whichever
+    process answers, a changed page never gets 304.
+    """
+
+    def get_page_generation(self) -> str:
+        """Return generation counter name of the page"""
+        raise NotImplementedError
+
+    def get_validators(self, request) -> Tuple[str, int]:
+        """Return ETag and Last-Modified timestamp of the page"""
+        generations = get_generations(
+            [GLOBAL_GENERATION, self.get_page_generation()])
+        # the page differs for every user and embeds the user's CSRF token
+        version = [generations, request.user.pk,
+                   request.COOKIES.get(settings.CSRF_COOKIE_NAME)]
+        etag = hashlib.md5(repr(version).encode()).hexdigest()
+        return quote_etag(etag), max(generations) // 10 ** 9
+
+    def dispatch(self, request, *args, **kwargs):
+        """Skip rendering when the client has the page already"""
+        if request.method not in ('GET', 'HEAD'):
+            return super().dispatch(request, *args, **kwargs)
+        etag, last_modified = self.get_validators(request)
+        # Last-Modified alone can not tell users apart
+        if request.user.is_authenticated:
+            last_modified = None
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = super().dispatch(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified)
+        cache_control = {'no_cache': True}
+        if request.user.is_authenticated:
+            cache_control['private'] = True
+        patch_cache_control(response, **cache_control)
+        return response
+
+
+def _respond(view, request, *args, **kwargs) -> HttpResponse:
+    """Run the view and render its response in one go"""
+    response = view(request, *args, **kwargs)
+    if isinstance(response, SimpleTemplateResponse):
+        response.render()
+    return response
+
+
+def _respond_in_pool(view, request, *args, **kwargs) -> HttpResponse:
+    """`_respond` in a pool thread, which keeps its own database
+    connection: it is closed as a request would close it
+    """
+    close_old_connections()
+    expire_health_checks()
+    try:
+        return _respond(view, request, *args, **kwargs)
+    finally:
+        close_old_connections()
+
+
+class AsyncViewMixin:
+    """Serve the view as a coroutine under ASGI.
+    There is no async ORM in this Django version, so queries and
+    rendering run as one call in a thread. With BLOG_ASYNC_THREAD_POOL
+    it is a thread of the pool rather than the single thread shared by
+    all sync code, so requests of many clients are handled at once.
+    The view is a coroutine only with BLOG_ASYNC_VIEWS, which the ASGI
+    entry point sets: under WSGI it would pay for an event loop and
+    thread hops on every request and gain nothing.
+    """
+
+    @classonlymethod
+    def as_view(cls, **initkwargs):  # noqa: N805
+        """Wrap the sync view into a coroutine function under ASGI"""
+        view = super().as_view(**initkwargs)
+        if not settings.BLOG_ASYNC_VIEWS:
+            return view
+
+        @wraps(view)
+        async def async_view(request, *args, **kwargs) -> HttpResponse:
+            if settings.BLOG_ASYNC_THREAD_POOL:
+                respond = sync_to_async(_respond_in_pool,
+                                        thread_sensitive=False)
+            else:
+                respond = sync_to_async(_respond)
+            return await respond(view, request, *args, **kwargs)
+
+        return async_view
@@ -1,6 +1,10 @@
+import uuid
+
 from django.db import models
+from django.db.models import F, Q
 from django.contrib.auth import get_user_model
 from django.urls import reverse
+from django.utils import timezone
 
 from core.constants import MAX_LENGTH_CHAR_FIELD
 
@@ -32,7 +36,19 @@ class Post(BaseModel):
 
     image = models.ImageField(verbose_name='Изображение к публикации',
                               upload_to='uploads/post_covers',
+                              db_index=True,
                               blank=True, null=True)
+    image_width = models.PositiveIntegerField(
+        null=True, editable=False, verbose_name='Ширина изображения',
+        help_text='Заполняется при сохранении нового изображения.')
+    image_height = models.PositiveIntegerField(
+        null=True, editable=False, verbose_name='Высота изображения',
+        help_text='Заполняется при сохранении нового изображения.')
+    image_variants = models.JSONField(
+        default=dict, editable=False,
+        verbose_name='Уменьшенные копии изображения',
+        help_text='Заполняется после обработки изображения, '
+                  'см. blog.images.')
     title = models.CharField(max_length=MAX_LENGTH_CHAR_FIELD,
                              verbose_name='Заголовок')
     text = models.TextField(verbose_name='Текст')
@@ -49,6 +65,17 @@ class Post(BaseModel):
                                  null=True,
                                  verbose_name='Категория',
                                  related_name='posts')
+    is_visible = models.BooleanField(
+        default=False, editable=False,
+        verbose_name='Виден на сайте',
+        help_text='Опубликован, дата публикации наступила и категория '
+                  'опубликована; для отложенных публикаций выставляется '
+                  'командой publish_scheduled.')
+    updated_at = models.DateTimeField(auto_now=True,
+                                      verbose_name='Изменено')
+    comment_count = models.PositiveIntegerField(
+        default=0, editable=False,
+        verbose_name='Количество комментариев')
 
     class Meta:
         """Meta class"""
@@ -56,18 +83,47 @@ class Post(BaseModel):
         verbose_name = 'публикация'
         verbose_name_plural = 'Публикации'
         ordering = ('-pub_date',)
+        # shaped after `core.helpers.filter_queryset` and keyset ordering;
+        # partial ones match its `is_visible` predicate as is
+        indexes = (
+            models.Index(fields=('-pub_date', 'id'),
+                         condition=Q(is_visible=True),
+                         name='post_visible_feed_idx'),
+            models.Index(fields=('category', '-pub_date', 'id'),
+                         condition=Q(is_visible=True),
+                         name='post_category_feed_idx'),
+            models.Index(fields=('pub_date',),
+                         condition=Q(is_published=True, is_visible=False),
+                         name='post_scheduled_idx'),
+            models.Index(fields=('author', '-pub_date', 'id'),
+                         name='post_author_feed_idx'),
+        )
 
     def __str__(self) -> str:
         """String representation"""
         return self.title
 
+    def save(self, *args, **kwargs) -> None:
+        """Keep visibility in sync with publication flag, date and
+        category state
+        """
+        self.is_visible = (
+            self.is_published
+            and self.pub_date is not None
+            and self.pub_date <= timezone.now()
+            and self.category is not None
+            and self.category.is_published)
+        super().save(*args, **kwargs)
+
     def get_absolute_url(self) -> str:
         """Get absolute path to the element"""
         return reverse('blog:post_detail', kwargs={'post_pk': self.pk})
 
-    def comment_count(self) -> int:
-        """Return count of comment for the post"""
-        return self.comments.count()
+    @classmethod
+    def shift_comment_count(cls, post_id: int, delta: int) -> None:
+        """Atomically add `delta` to the stored comment counter of the post"""
+        cls.objects.filter(pk=post_id).update(
+            comment_count=F('comment_count') + delta)
 
 
 class Category(BaseModel):
@@ -128,3 +184,85 @@ class Comment(models.Model):
     def __str__(self) -> str:
         """String representation"""
         return f"комментарий от {self.author.username} на {self.post.title}"
+
+
+class StoredFile(models.Model):
+    """Reference counter of a content-addressed file, see blog.storage"""
+
+    name = models.CharField(max_length=MAX_LENGTH_CHAR_FIELD, unique=True,
+                            verbose_name='Имя файла')
+    ref_count = models.PositiveIntegerField(
+        default=0, verbose_name='Количество ссылок',
+        help_text='Файл удаляется, когда на него не остаётся ссылок.')
+
+    class Meta:
+        """Meta class"""
+
+        verbose_name = 'файл'
+        verbose_name_plural = 'Файлы'
+
+    def __str__(self) -> str:
+        """String representation"""
+        return self.name
+
+
+class ChunkedUpload(models.Model):
+    """Image being uploaded in chunks, see blog.uploads"""
+
+    token = models.UUIDField(primary_key=True, default=uuid.uuid4,
+                             editable=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE,
+                             related_name='uploads',
+                             verbose_name='Пользователь')
+    filename = models.CharField(max_length=MAX_LENGTH_CHAR_FIELD,
+                                verbose_name='Имя файла')
+    size = models.PositiveBigIntegerField(verbose_name='Размер, байт')
+    checksum = models.CharField(max_length=64,
+                                verbose_name='Контрольная сумма SHA-256')
+    received = models.PositiveBigIntegerField(default=0,
+                                              verbose_name='Получено, байт')
+    is_complete = models.BooleanField(default=False,
+                                      verbose_name='Загрузка завершена')
+    created_at = models.DateTimeField(auto_now_add=True,
+                                      verbose_name='Начата')
+
+    class Meta:
+        """Meta class"""
+
+        verbose_name = 'загрузка'
+        verbose_name_plural = 'Загрузки'
+
+    def __str__(self) -> str:
+        """String representation"""
+        return f'{self.filename} ({self.received}/{self.size})'
+
+
+class QueuedEmail(models.Model):
+    """Message waiting for delivery by `send_queued_mail`, see blog.mail"""
+
+    from_email = models.CharField(max_length=MAX_LENGTH_CHAR_FIELD,
+                                  verbose_name='Отправитель')
+    recipients = models.JSONField(verbose_name='Получатели')
+    message = models.BinaryField(verbose_name='Сообщение в формате MIME')
+    attempts = models.PositiveSmallIntegerField(
+        default=0, verbose_name='Неудачных попыток отправки')
+    last_error = models.TextField(blank=True,
+                                  verbose_name='Последняя ошибка')
+    claimed_until = models.DateTimeField(
+        null=True, blank=True, editable=False,
+        verbose_name='Отправляется до',
+        help_text='Письмо отправляет send_queued_mail; после этого '
+                  'времени его может взять другой процесс.')
+    created_at = models.DateTimeField(auto_now_add=True,
+                                      verbose_name='Добавлено')
+
+    class Meta:
+        """Meta class"""
+
+        verbose_name = 'письмо в очереди'
+        verbose_name_plural = 'Очередь писем'
+        ordering = ('pk',)
+
+    def __str__(self) -> str:
+        """String representation"""
+        return f'{", ".join(self.recipients)} ({self.created_at})'
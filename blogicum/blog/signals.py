@@ -0,0 +1,207 @@
+from contextvars import ContextVar
+from typing import List, Optional
+
+from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models.signals import (post_delete, post_save, pre_delete,
+                                      pre_save)
+from django.dispatch import receiver
+
+from .cache import (FEED_GENERATION, GLOBAL_GENERATION, author_generation,
+                    bump_generations, category_generation, post_generation,
+                    post_generations)
+from .images import image_dimensions, release_image, schedule_variants
+from .models import Category, Comment, Location, Post
+from .visibility import schedule_category_sync
+
+User = get_user_model()
+
+# posts being deleted: their comments go with them
+_deleted_posts = ContextVar('deleted_posts', default=frozenset())
+
+
+def bump_after_commit(*names: str) -> None:
+    """Bump the counters once the change is committed: a page built
+    meanwhile from the old rows would be cached under the new values
+    """
+    transaction.on_commit(lambda: bump_generations(*names))
+
+
+@receiver(pre_save, sender=Post)
+def remember_post_pages(sender, instance, raw=False, **kwargs) -> None:
+    """Remember the author and category the post is listed under"""
+    instance._old_pages = None
+    if instance.pk and not raw:
+        instance._old_pages = Post.objects.filter(pk=instance.pk).values(
+            'author_id', 'author__username', 'category_id',
+            'category__slug').first()
+
+
+def _listing_generations(post: Post, old: Optional[dict]) -> List[str]:
+    """Counters of the author and category pages listing the post now
+    and before it was saved. Names known before saving are reused, so
+    relations are loaded only when they have changed or on deletion.
+    """
+    generations = []
+    if old:
+        generations.append(author_generation(old['author__username']))
+        if old['category_id']:
+            generations.append(category_generation(old['category__slug']))
+    if not old or old['author_id'] != post.author_id:
+        generations.append(author_generation(post.author.username))
+    if post.category_id and (not old
+                             or old['category_id'] != post.category_id):
+        generations.append(category_generation(post.category.slug))
+    return generations
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post_pages(sender, instance, raw=False, **kwargs) -> None:
+    """Invalidate pages listing the post"""
+    if raw:
+        # relations of a fixture may be loaded after the post
+        bump_after_commit(GLOBAL_GENERATION)
+        return
+    bump_after_commit(
+        FEED_GENERATION, post_generation(instance.pk),
+        *_listing_generations(instance,
+                              getattr(instance, '_old_pages', None)))
+
+
+@receiver(pre_save, sender=Post)
+def remember_post_image(sender, instance, raw=False, **kwargs) -> None:
+    """Remember the image the post had before saving, measure a new one"""
+    if raw:
+        return
+    old = Post.objects.filter(pk=instance.pk).values(
+        'image', 'image_variants').first()
+    instance._old_image = old
+    # an upload is saved by the storage when the post is saved
+    instance._image_uploaded = bool(instance.image
+                                    and not instance.image._committed)
+    if (old is None or (old['image'] or '') != (instance.image.name or '')
+            or instance.image and instance.image_width is None):
+        instance.image_width, instance.image_height = image_dimensions(
+            instance.image)
+
+
+@receiver(post_save, sender=Post)
+def update_image_variants(sender, instance, raw=False, **kwargs) -> None:
+    """Release a replaced image with its copies, render missing ones"""
+    if raw:
+        return
+    old = getattr(instance, '_old_image', None)
+    if old and (old['image'] or '') == (instance.image.name or ''):
+        if getattr(instance, '_image_uploaded', False):
+            # the same content uploaded again took one more reference
+            default_storage.delete(instance.image.name)
+    elif old:
+        release_image(old['image'], old['image_variants'])
+        if instance.image_variants:
+            instance.image_variants = {}
+            Post.objects.filter(pk=instance.pk).update(image_variants={})
+    if instance.image and not instance.image_variants:
+        schedule_variants(instance)
+
+
+@receiver(post_delete, sender=Post)
+def release_post_image(sender, instance, **kwargs) -> None:
+    """The image and its copies are not needed without the post"""
+    release_image(instance.image.name, instance.image_variants)
+
+
+@receiver(pre_save, sender=Category)
+def remember_category_state(sender, instance, **kwargs) -> None:
+    """Remember whether publication state of the category changes"""
+    instance._was_published = Category.objects.filter(
+        pk=instance.pk).values_list('is_published', flat=True).first()
+
+
+@receiver(post_save, sender=Category)
+def propagate_category_state(sender, instance, created, raw=False,
+                             **kwargs) -> None:
+    """Show or hide posts of the category"""
+    if (not created and not raw
+            and instance._was_published != instance.is_published):
+        schedule_category_sync(instance.pk)
+
+
+@receiver(post_delete, sender=Category)
+def hide_orphan_posts(sender, instance, **kwargs) -> None:
+    """Posts left without category are not shown"""
+    schedule_category_sync(None)
+
+
+@receiver(pre_delete, sender=Post)
+def remember_deleted_post(sender, instance, **kwargs) -> None:
+    """Sent before the cascade deletes the comments of the post"""
+    _deleted_posts.set(_deleted_posts.get() | {instance.pk})
+
+
+@receiver(post_delete, sender=Post)
+def forget_deleted_post(sender, instance, **kwargs) -> None:
+    """The post and its comments are gone"""
+    _deleted_posts.set(_deleted_posts.get() - {instance.pk})
+
+
+@receiver(pre_save, sender=Comment)
+def remember_comment_post(sender, instance, raw=False, **kwargs) -> None:
+    """Remember the post of an edited comment, it may be moved"""
+    instance._old_post_id = None
+    if instance.pk and not raw:
+        instance._old_post_id = Comment.objects.filter(
+            pk=instance.pk).values_list('post_id', flat=True).first()
+
+
+@receiver(post_save, sender=Comment)
+def count_saved_comment(sender, instance, created, raw=False,
+                        **kwargs) -> None:
+    """Keep `Post.comment_count` of the posts the comment was added to
+    or moved from; fixtures carry the counters themselves
+    """
+    if raw:
+        return
+    old_post_id = getattr(instance, '_old_post_id', None)
+    if created:
+        Post.shift_comment_count(instance.post_id, 1)
+    elif old_post_id is not None and old_post_id != instance.post_id:
+        Post.shift_comment_count(old_post_id, -1)
+        Post.shift_comment_count(instance.post_id, 1)
+
+
+@receiver(post_delete, sender=Comment)
+def count_deleted_comment(sender, instance, **kwargs) -> None:
+    """Comments deleted in any way leave the counter; the counter of a
+    deleted post goes with it
+    """
+    if instance.post_id not in _deleted_posts.get():
+        Post.shift_comment_count(instance.post_id, -1)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_comment_pages(sender, instance, **kwargs) -> None:
+    """Comments of the post and its counter on the card have changed;
+    pages of a deleted post are invalidated by its own receiver
+    """
+    if instance.post_id not in _deleted_posts.get():
+        bump_after_commit(*post_generations(instance.post_id))
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def invalidate_all_pages(sender, **kwargs) -> None:
+    """Categories and locations are shown on the cards of every page"""
+    bump_after_commit(GLOBAL_GENERATION)
+
+
+@receiver(post_save, sender=User)
+def invalidate_user_pages(sender, update_fields=None, **kwargs) -> None:
+    """Usernames are shown on the cards, logins do not matter"""
+    if update_fields and set(update_fields) == {'last_login'}:
+        return
+    bump_after_commit(GLOBAL_GENERATION)
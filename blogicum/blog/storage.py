@@ -0,0 +1,71 @@
+"""Content-addressed storage of uploaded files.
+
+A file is named by the SHA-256 of its content and sharded into nested
+directories, e.g. `uploads/post_covers/ab/cd/abcd….jpg`, so no directory
+grows too large. Identical uploads share one file: `StoredFile` counts
+the references and the file is removed when the last one is deleted.
+"""
+import hashlib
+import os
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.db import transaction
+from django.db.models import F
+
+from .models import StoredFile
+from core.constants import STORAGE_SHARD_LEVELS
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """File system storage naming files by their content"""
+
+    @staticmethod
+    def content_name(name: str, content: File) -> str:
+        """Sharded name of the content keeping directory and extension"""
+        digest = hashlib.sha256()
+        content.seek(0)
+        for chunk in content.chunks():
+            digest.update(chunk)
+        content.seek(0)
+        digest = digest.hexdigest()
+        directory, filename = os.path.split(name)
+        shards = [digest[level * 2:level * 2 + 2]
+                  for level in range(STORAGE_SHARD_LEVELS)]
+        return os.path.join(directory, *shards,
+                            digest + os.path.splitext(filename)[1].lower())
+
+    def _save(self, name: str, content: File) -> str:
+        name = self.content_name(name, content)
+        with transaction.atomic():
+            StoredFile.objects.get_or_create(name=name)
+            StoredFile.objects.filter(name=name).update(
+                ref_count=F('ref_count') + 1)
+        if not self.exists(name):
+            saved = super()._save(name, content)
+            if saved != name:
+                # the same content has just been saved concurrently
+                super().delete(saved)
+        return name
+
+    def delete(self, name: str) -> None:
+        """Drop one reference, remove the file with the last one after
+        the transaction commits. Files saved before the storage was used
+        have no counter and are removed with their only reference.
+        """
+        with transaction.atomic():
+            stored = StoredFile.objects.select_for_update().filter(
+                name=name).first()
+            if stored is not None:
+                if stored.ref_count > 1:
+                    stored.ref_count = F('ref_count') - 1
+                    stored.save(update_fields=('ref_count',))
+                    return
+                stored.delete()
+
+        def remove() -> None:
+            # the same content may have been uploaded again meanwhile
+            if not StoredFile.objects.filter(name=name).exists():
+                super(ContentAddressedStorage, self).delete(name)
+
+        transaction.on_commit(remove)
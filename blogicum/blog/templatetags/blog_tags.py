@@ -0,0 +1,75 @@
+import hashlib
+from typing import Iterable, List
+
+from django import template
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from blog.models import Post
+from core.constants import CARD_CACHE_TIMEOUT, IMAGE_SIZES
+
+register = template.Library()
+
+
+def card_cache_key(post: Post) -> str:
+    """Key changes with everything the rendered card depends on"""
+    version = [post.id, post.updated_at.isoformat(), post.comment_count,
+               post.author.username, post.image_variants]
+    if post.category:
+        version += [post.category.is_published, post.category.slug,
+                    post.category.title]
+    if post.location:
+        version += [post.location.is_published, post.location.name]
+    digest = hashlib.md5(repr(version).encode()).hexdigest()
+    return f'blog:card:{post.id}:{digest}'
+
+
+@register.simple_tag
+def post_cards(posts: Iterable[Post]) -> List[str]:
+    """Return rendered cards of the posts, taking unchanged ones from
+    cache in one round-trip and rendering only the missing ones
+    """
+    posts = list(posts)
+    keys = [card_cache_key(post) for post in posts]
+    cards = cache.get_many(keys)
+    rendered = {}
+    for key, post in zip(keys, posts):
+        if key not in cards:
+            rendered[key] = render_to_string('includes/post_card.html',
+                                             {'post': post})
+    if rendered:
+        cache.set_many(rendered, CARD_CACHE_TIMEOUT)
+        cards.update(rendered)
+    return [mark_safe(cards[key]) for key in keys]
+
+
+def _srcset(post: Post, image_format: str) -> str:
+    """Copies of the image in the format with their widths"""
+    return ', '.join(
+        f"{default_storage.url(copies[image_format])} {copies['width']}w"
+        for copies in sorted(post.image_variants.values(),
+                             key=lambda copies: copies['width'])
+    )
+
+
+@register.inclusion_tag('includes/post_image.html')
+def post_image(post: Post, variant: str, lazy: bool = True) -> dict:
+    """Render the image of the post with its downscaled copies and
+    dimensions stored in the database, so no file is opened. Until the
+    copies are ready the original image is shown.
+    """
+    copies = post.image_variants.get(variant)
+    if not copies:
+        return {'src': post.image.url, 'width': post.image_width,
+                'height': post.image_height, 'lazy': lazy}
+    return {
+        'src': default_storage.url(copies['JPEG']),
+        'srcset': _srcset(post, 'JPEG'),
+        'webp_srcset': _srcset(post, 'WEBP'),
+        'sizes': IMAGE_SIZES,
+        'width': copies['width'],
+        'height': copies['height'],
+        'lazy': lazy,
+    }
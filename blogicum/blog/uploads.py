@@ -0,0 +1,137 @@
+"""Resumable chunked uploads of post images.
+
+A client announces the file (name, size, SHA-256), then sends it in
+chunks with their offsets, each chunk written straight to a temporary
+file. An interrupted upload resumes from the stored offset. When the
+last byte arrives the checksum is verified, and `PostForm` attaches the
+finished upload by its token. The storage copies the file rather than
+moves it: the temporary file is removed only once the post is
+committed, so a transaction rerun by `core.db.retry_on_lock` still
+finds it.
+"""
+import hashlib
+import os
+import re
+from datetime import timedelta
+from pathlib import Path
+from typing import BinaryIO
+
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from django.utils import timezone
+
+from .models import ChunkedUpload
+from core.constants import UPLOAD_EXPIRY, UPLOAD_MAX_SIZE
+
+CHECKSUM = re.compile(r'^[0-9a-f]{64}$')
+BLOCK_SIZE = 64 * 1024
+
+
+class UploadError(Exception):
+    """Raised when an upload or its chunk can not be accepted"""
+
+
+class OffsetMismatch(UploadError):
+    """Raised when a chunk does not continue the received data"""
+
+
+class UploadedChunks(File):
+    """Finished upload. Without `temporary_file_path()` storages copy
+    its temporary file instead of moving it away.
+    """
+
+    def __init__(self, upload: ChunkedUpload) -> None:
+        self.path = upload_path(upload)
+        super().__init__(open(self.path, 'rb'), name=upload.filename)
+
+
+def upload_path(upload: ChunkedUpload) -> Path:
+    """Temporary file receiving the chunks"""
+    return Path(settings.CHUNKED_UPLOAD_ROOT) / f'{upload.token}.part'
+
+
+def start_upload(user, filename: str, size: int,
+                 checksum: str) -> ChunkedUpload:
+    """Register an upload and create its empty temporary file"""
+    checksum = checksum.lower()
+    if not 0 < size <= UPLOAD_MAX_SIZE:
+        raise UploadError(
+            f'Размер файла должен быть не больше {UPLOAD_MAX_SIZE} байт')
+    if not CHECKSUM.match(checksum):
+        raise UploadError('Неверная контрольная сумма SHA-256')
+    upload = ChunkedUpload.objects.create(
+        user=user, filename=os.path.basename(filename), size=size,
+        checksum=checksum)
+    path = upload_path(upload)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.touch()
+    return upload
+
+
+def append_chunk(upload: ChunkedUpload, offset: int, stream: BinaryIO,
+                 length: int) -> ChunkedUpload:
+    """Write `length` bytes from `stream` at `offset`. Bytes received
+    before the client disconnects are kept, so the next chunk resumes
+    right after them. A slow client is read outside any transaction:
+    the offset is advanced afterwards by a conditional UPDATE, and of
+    two chunks sent at the same offset only the first one counts.
+    """
+    if upload.is_complete or offset != upload.received:
+        raise OffsetMismatch(upload.received)
+    if offset + length > upload.size:
+        raise UploadError('Фрагмент выходит за пределы файла')
+    with open(upload_path(upload), 'r+b') as file:
+        file.seek(offset)
+        remaining = length
+        while remaining:
+            block = stream.read(min(BLOCK_SIZE, remaining))
+            if not block:
+                break
+            file.write(block)
+            remaining -= len(block)
+    received = offset + length - remaining
+    advanced = ChunkedUpload.objects.filter(
+        pk=upload.pk, received=offset, is_complete=False
+    ).update(received=received)
+    if not advanced:
+        raise OffsetMismatch(offset)
+    upload.received = received
+    if upload.received == upload.size:
+        # bytes of a concurrent losing chunk are caught here
+        if file_checksum(upload_path(upload)) != upload.checksum:
+            discard_upload(upload)
+            raise UploadError('Контрольная сумма файла не совпадает')
+        upload.is_complete = True
+        upload.save(update_fields=('is_complete',))
+    return upload
+
+
+def file_checksum(path: Path) -> str:
+    """SHA-256 of the file content"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def discard_upload(upload: ChunkedUpload) -> None:
+    """Forget the upload and remove what is left of its file once the
+    transaction is committed, so a rerun one still finds the file
+    """
+    path = upload_path(upload)
+    upload.delete()
+    transaction.on_commit(lambda: path.unlink(missing_ok=True))
+
+
+def expired_uploads():
+    """Uploads started too long ago to be finished"""
+    return ChunkedUpload.objects.filter(
+        created_at__lt=timezone.now() - timedelta(seconds=UPLOAD_EXPIRY))
+
+
+def upload_state(upload: ChunkedUpload) -> dict:
+    """What a client needs to resume the upload"""
+    return {'token': str(upload.token), 'offset': upload.received,
+            'size': upload.size, 'complete': upload.is_complete}
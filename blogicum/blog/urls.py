@@ -11,6 +11,8 @@ urlpatterns = [
     # Posts url part
     path('posts/<int:post_pk>/', views.PostDetailView.as_view(),
          name='post_detail'),
+    path('posts/<int:post_pk>/comments/', views.PostCommentsView.as_view(),
+         name='post_comments'),
     path('posts/<int:post_pk>/edit/', views.PostUpdateView.as_view(),
          name='edit_post'),
     path('posts/<int:post_pk>/delete/', views.PostDeleteView.as_view(),
@@ -18,6 +20,11 @@ urlpatterns = [
     path('posts/create/', views.PostCreateView.as_view(),
          name='create_post'),
 
+    # Chunked uploads of post images
+    path('uploads/', views.UploadCreateView.as_view(), name='start_upload'),
+    path('uploads/<uuid:token>/', views.UploadChunkView.as_view(),
+         name='upload_chunk'),
+
     # Comments url part
     path('posts/<int:post_pk>/comment/',
          views.CommentCreateView.as_view(), name='add_comment'),
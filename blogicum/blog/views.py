@@ -2,95 +2,144 @@ from django.contrib.auth import get_user_model
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.db.models.base import Model
 from django.db.models.query import QuerySet
-from django.http import Http404
+from django.http import Http404, JsonResponse
 from django.http.response import HttpResponse
 from django.shortcuts import get_object_or_404, redirect
 from django.views.generic import (ListView, DetailView, CreateView,
-                                  UpdateView, DeleteView)
+                                  UpdateView, DeleteView, View)
 from django.urls import reverse
-from django.utils import timezone
 from typing import Any
 
-from .mixins import SuccessURLMixin, PostViewMixin, CommentViewMixin
-from .models import Post, Category, Comment
+from .cache import (FEED_GENERATION, author_generation, category_generation,
+                    post_generation)
+from .mixins import (SuccessURLMixin, PostViewMixin, PostFormMixin,
+                     CommentViewMixin, KeysetPaginationMixin,
+                     AnonymousPageCacheMixin, AsyncViewMixin,
+                     ConditionalGetMixin, LockRetryMixin,
+                     ReplicaReadMixin)
+from .images import image_posts
+from .models import ChunkedUpload, Post, Category, Comment
 from .forms import PostForm, CommentsForm
-from core.helpers import filter_queryset
-from core.constants import MAX_POSTS_COUNT
+from .uploads import (OffsetMismatch, UploadError, append_chunk,
+                      start_upload, upload_state)
+from core.budget import query_budget
+from core.helpers import filter_queryset, published_query
+from core.media import serve_media
+from core.paginator import KeysetPaginator
+from core.constants import (MAX_POSTS_COUNT, MAX_COMMENTS_COUNT,
+                            UPLOAD_CHUNK_MAX_SIZE)
 
 
 User = get_user_model()
 
 
-class PostListView(ListView):
+@query_budget(5)
+class PostListView(AsyncViewMixin, ReplicaReadMixin, ConditionalGetMixin,
+                   AnonymousPageCacheMixin, KeysetPaginationMixin, ListView):
     """Main List View for page containing all posts"""
 
     template_name = "blog/index.html"
     queryset = filter_queryset(Post.objects)
     paginate_by = MAX_POSTS_COUNT
 
+    def get_page_generation(self) -> str:
+        """The page lists every post"""
+        return FEED_GENERATION
 
-class PostCreateView(PostViewMixin, LoginRequiredMixin, CreateView):
+
+@query_budget(21)
+class PostCreateView(PostFormMixin, PostViewMixin, LoginRequiredMixin,
+                     LockRetryMixin, CreateView):
     """Post create view"""
 
     template_name = "blog/create.html"
-    form_class = PostForm
 
     def form_valid(self, form) -> HttpResponse:
-        """Redefine method to add author to the post"""
-        object = form.save(commit=False)
-        object.author = self.request.user
-        object.save()
+        """Redefine method to add author to the post, the form saves it"""
+        form.instance.author = self.request.user
         return super().form_valid(form)
 
 
-class PostUpdateView(PostViewMixin, UpdateView):
+@query_budget(41)
+class PostUpdateView(PostFormMixin, PostViewMixin, LockRetryMixin,
+                     UpdateView):
     """Update post view"""
 
     template_name = "blog/create.html"
-    form_class = PostForm
 
     def form_valid(self, form) -> HttpResponse:
         """
         Redifine form valid method
         validate form only if current user is the author
         """
-        post = self.get_object()
-        if self.is_author(post):
+        if self.is_author(self.object):
             return super().form_valid(form)
-        return redirect("blog:post_detail", post_pk=post.pk)
+        return redirect("blog:post_detail", post_pk=self.object.pk)
 
     def get_success_url(self) -> str:
         """Generate URL dymanically based on post ID"""
         return reverse("blog:post_detail", args=[self.kwargs['post_pk']])
 
 
-class PostDetailView(PostViewMixin, DetailView):
+@query_budget(6)
+class PostDetailView(AsyncViewMixin, ReplicaReadMixin, ConditionalGetMixin,
+                     PostViewMixin, DetailView):
     """Detail View for post"""
 
     template_name = "blog/detail.html"
 
+    def get_page_generation(self) -> str:
+        """The page shows the post and its comments"""
+        return post_generation(self.kwargs[self.pk_url_kwarg])
+
     def get_object(self, queryset: QuerySet[Any] = None) -> Model:
-        """Get post if its parameters is valid"""
-        post = super().get_object()
-        now = timezone.now()
-        if self.is_author(post) or (post.is_published and post.pub_date < now
-                                    and post.category.is_published):
-            return post
-        raise Http404("Пост не найден, или недоступен")
+        """Get post only if it is visible for current user"""
+        return self.get_visible_post()
 
     def get_context_data(self, **kwargs) -> dict[str, Any]:
-        """Add extra data to context"""
+        """Add extra data to context, comments are limited to the first
+        batch, the rest are loaded by `PostCommentsView`
+        """
         context = super().get_context_data(**kwargs)
         context["form"] = CommentsForm(self.request.POST or None)
-        context["comments"] = self.object.comments.all()
+        context["comments"] = KeysetPaginator(
+            self.object.comments.select_related('author'),
+            MAX_COMMENTS_COUNT, PostCommentsView.keyset_ordering).page()
         context["post"] = self.object
         return context
 
 
-class PostDeleteView(PostViewMixin, LoginRequiredMixin, DeleteView):
+@query_budget(6)
+class PostCommentsView(ReplicaReadMixin, PostViewMixin, KeysetPaginationMixin,
+                       ListView):
+    """Next batch of rendered comments of the post"""
+
+    template_name = "includes/comment_list.html"
+    paginate_by = MAX_COMMENTS_COUNT
+    keyset_ordering = ('created_at', 'id')
+    post = None
+
+    def get_queryset(self) -> QuerySet:
+        """Comments of the post visible for current user"""
+        self.post = self.get_visible_post()
+        return self.post.comments.select_related('author')
+
+    def get_context_data(self, **kwargs) -> dict[str, Any]:
+        """Pass the page under the name used by the template"""
+        context = super().get_context_data(**kwargs)
+        context["post"] = self.post
+        context["comments"] = context["page_obj"]
+        return context
+
+
+@query_budget(26)
+class PostDeleteView(PostViewMixin, LoginRequiredMixin, LockRetryMixin,
+                     DeleteView):
     """Delete post view"""
 
     template_name = "blog/create.html"
+    # the author is checked and, with the category, names stale pages
+    queryset = Post.objects.select_related('author', 'category')
 
     def get_object(self) -> Model:
         """Delete post only if current user is author and post exists"""
@@ -106,7 +155,10 @@ class PostDeleteView(PostViewMixin, LoginRequiredMixin, DeleteView):
         return context
 
 
-class CategoryPostsView(ListView):
+@query_budget(6)
+class CategoryPostsView(AsyncViewMixin, ReplicaReadMixin,
+                        ConditionalGetMixin, AnonymousPageCacheMixin,
+                        KeysetPaginationMixin, ListView):
     """Posts of concrete category"""
 
     template_name = "blog/category.html"
@@ -114,6 +166,10 @@ class CategoryPostsView(ListView):
     paginate_by = MAX_POSTS_COUNT
     category = None
 
+    def get_page_generation(self) -> str:
+        """The page lists posts of the category"""
+        return category_generation(self.kwargs["category_slug"])
+
     def get_queryset(self) -> QuerySet:
         """Override get_queryset method to filter post by category"""
         queryset = Post.objects.all()
@@ -129,7 +185,9 @@ class CategoryPostsView(ListView):
         return context
 
 
-class ProfileView(ListView):
+@query_budget(6)
+class ProfileView(AsyncViewMixin, ReplicaReadMixin, ConditionalGetMixin,
+                  AnonymousPageCacheMixin, KeysetPaginationMixin, ListView):
     """View for displayin Profile page
     Profile page simply is a TemplateView but we need to display
     related to it posts. That is why we use ListView and custom
@@ -141,6 +199,10 @@ class ProfileView(ListView):
     paginate_by = MAX_POSTS_COUNT
     profile = None
 
+    def get_page_generation(self) -> str:
+        """The page lists posts of the author"""
+        return author_generation(self.kwargs["username"])
+
     def get_queryset(self) -> QuerySet:
         """Get post by username kwarg"""
         self.profile = get_object_or_404(
@@ -159,7 +221,8 @@ class ProfileView(ListView):
         return context
 
 
-class ProfileUpdateView(LoginRequiredMixin, UpdateView):
+@query_budget(7)
+class ProfileUpdateView(LoginRequiredMixin, LockRetryMixin, UpdateView):
     """Update profile view"""
 
     model = User
@@ -175,7 +238,9 @@ class ProfileUpdateView(LoginRequiredMixin, UpdateView):
         return reverse("blog:profile", args=[self.request.user.username])
 
 
-class CommentCreateView(LoginRequiredMixin, SuccessURLMixin, CreateView):
+@query_budget(9)
+class CommentCreateView(LoginRequiredMixin, LockRetryMixin, SuccessURLMixin,
+                        CreateView):
     """Create comment view"""
 
     model = Comment
@@ -191,15 +256,88 @@ class CommentCreateView(LoginRequiredMixin, SuccessURLMixin, CreateView):
         post = get_object_or_404(Post, pk=self.kwargs["post_pk"])
         object = form.save(commit=False)
         object.author, object.post = self.request.user, post
-        object.save()
         return super().form_valid(form)
 
 
+@query_budget(9)
 class CommentUpdateView(CommentViewMixin, UpdateView):
     """Update comment only by its owner"""
 
     fields = ("text",)
 
 
+@query_budget(9)
 class CommentDeleteView(CommentViewMixin, DeleteView):
     """Delete comment"""
+
+
+@query_budget(6)
+class MediaView(View):
+    """Serve uploaded images. Images of hidden posts are shown to their
+    authors and staff only.
+    """
+
+    def get(self, request, path: str) -> HttpResponse:
+        """Check access and hand the file off, see `core.media`"""
+        posts = image_posts(path)
+        public = posts.filter(published_query()).exists()
+        if not public and not (request.user.is_staff or (
+                request.user.is_authenticated
+                and posts.filter(author=request.user).exists())):
+            raise Http404("Файл не найден")
+        return serve_media(request, path, public=public)
+
+
+@query_budget(5)
+class UploadCreateView(LoginRequiredMixin, View):
+    """Start a chunked upload of a post image, see `blog.uploads`"""
+
+    def post(self, request) -> HttpResponse:
+        """Register the file by its name, size and SHA-256"""
+        try:
+            size = int(request.POST.get('size', ''))
+        except ValueError:
+            return JsonResponse({'error': 'Не указан размер файла'},
+                                status=400)
+        try:
+            upload = start_upload(request.user,
+                                  request.POST.get('filename', ''), size,
+                                  request.POST.get('checksum', ''))
+        except UploadError as error:
+            return JsonResponse({'error': str(error)}, status=400)
+        return JsonResponse(upload_state(upload), status=201)
+
+
+@query_budget(7)
+class UploadChunkView(LoginRequiredMixin, View):
+    """Report how much of the upload is received, receive a chunk"""
+
+    def get_upload(self) -> ChunkedUpload:
+        """Only the user who started the upload may continue it"""
+        return get_object_or_404(ChunkedUpload, pk=self.kwargs['token'],
+                                 user=self.request.user)
+
+    def get(self, request, token) -> HttpResponse:
+        """Offset to resume the upload from"""
+        return JsonResponse(upload_state(self.get_upload()))
+
+    def put(self, request, token) -> HttpResponse:
+        """Write the request body at the `Upload-Offset` header"""
+        upload = self.get_upload()
+        try:
+            offset = int(request.headers['Upload-Offset'])
+            length = int(request.META.get('CONTENT_LENGTH') or 0)
+        except (KeyError, ValueError):
+            return JsonResponse({'error': 'Не указано смещение фрагмента'},
+                                status=400)
+        if length > UPLOAD_CHUNK_MAX_SIZE:
+            return JsonResponse({'error': 'Слишком большой фрагмент'},
+                                status=413)
+        try:
+            upload = append_chunk(upload, offset, request, length)
+        except OffsetMismatch:
+            upload.refresh_from_db()
+            return JsonResponse(upload_state(upload), status=409)
+        except UploadError as error:
+            return JsonResponse({'error': str(error)}, status=400)
+        return JsonResponse(upload_state(upload))
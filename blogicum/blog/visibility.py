@@ -0,0 +1,70 @@
+"""Propagation of category publication state to `Post.is_visible`.
+
+A category may hold lots of posts, so they are updated in batches of
+bounded size, each in its own short transaction, once the category
+change is committed. Until the last batch commits `published_query()`
+still shows some posts of a hidden category.
+
+The category row itself records the state, so no change is lost when a
+process stops before its posts are updated: the `publish_scheduled`
+worker shows due posts of published categories and hides the posts left
+visible in hidden or deleted ones, see `hide_stale_posts`.
+"""
+from typing import Optional
+
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.functions import Now
+
+from .cache import GLOBAL_GENERATION, bump_generations
+from .models import Category, Post
+from core.constants import VISIBILITY_BATCH_SIZE
+
+
+def update_in_batches(stale, is_visible: bool, batch_size: int) -> int:
+    """Set `is_visible` of the stale posts, `batch_size` posts per
+    transaction. Return the number of updated posts.
+    """
+    updated = 0
+    while True:
+        with transaction.atomic():
+            batch = list(stale.order_by().values_list('pk', flat=True)[
+                :batch_size])
+            Post.objects.filter(pk__in=batch).update(is_visible=is_visible)
+        updated += len(batch)
+        if len(batch) < batch_size:
+            break
+    if updated:
+        # pages built before the commit would show the old state
+        transaction.on_commit(lambda: bump_generations(GLOBAL_GENERATION))
+    return updated
+
+
+def sync_category_visibility(category_id: Optional[int],
+                             batch_size: int = VISIBILITY_BATCH_SIZE) -> int:
+    """Bring `is_visible` of the category posts in line with the
+    category state, `None` stands for posts left without category.
+    Return the number of updated posts.
+    """
+    is_published = category_id is not None and Category.objects.filter(
+        pk=category_id, is_published=True).exists()
+    stale = Post.objects.filter(category_id=category_id,
+                                is_visible=not is_published)
+    if is_published:
+        stale = stale.filter(is_published=True, pub_date__lte=Now())
+    return update_in_batches(stale, is_published, batch_size)
+
+
+def schedule_category_sync(category_id: Optional[int]) -> None:
+    """Update posts of the category after the current transaction"""
+    transaction.on_commit(lambda: sync_category_visibility(category_id))
+
+
+def hide_stale_posts(batch_size: int = VISIBILITY_BATCH_SIZE) -> int:
+    """Hide visible posts of hidden categories and posts left without
+    category. Return the number of hidden posts.
+    """
+    stale = Post.objects.filter(
+        Q(category__isnull=True) | Q(category__is_published=False),
+        is_visible=True)
+    return update_in_batches(stale, False, batch_size)
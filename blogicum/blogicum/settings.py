@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/3.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -45,19 +46,22 @@ INSTALLED_APPS = [
     'django_bootstrap5',
 
     # Custom apps
+    'core.apps.CoreConfig',
     'blog.apps.BlogConfig',
     'pages.apps.PagesConfig',
     'users.apps.UsersConfig',
 ]
 
 MIDDLEWARE = [
+    'core.budget.QueryBudgetMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
-    'django.middleware.clickjacking.XFrameOptionsMiddleware'
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.replicas.PrimaryAfterWriteMiddleware',
 ]
 
 ROOT_URLCONF = 'blogicum.urls'
@@ -88,13 +92,100 @@ WSGI_APPLICATION = 'blogicum.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/3.2/ref/settings/#databases
 
+# Read from the environment: DB_ENGINE names a django.db.backends module
+# (sqlite3 by default), DB_NAME, DB_USER, DB_PASSWORD, DB_HOST and DB_PORT
+# the database. Connections live for DB_CONN_MAX_AGE seconds and are
+# checked before reuse, see core.db.install_health_check.
+DB_ENGINE = os.environ.get('DB_ENGINE', 'sqlite3')
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'ENGINE': f'django.db.backends.{DB_ENGINE}',
+        'NAME': os.environ.get('DB_NAME', BASE_DIR / 'db.sqlite3'),
+        'USER': os.environ.get('DB_USER', ''),
+        'PASSWORD': os.environ.get('DB_PASSWORD', ''),
+        'HOST': os.environ.get('DB_HOST', ''),
+        'PORT': os.environ.get('DB_PORT', ''),
+        'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 60)),
     }
 }
 
+# DB_REPLICAS lists comma separated hosts of read replicas (files for
+# SQLite, copied from the primary by the sync_replicas command); public
+# pages read from them, see core.replicas
+DATABASE_REPLICAS = []
+for number, replica in enumerate(
+        filter(None, os.environ.get('DB_REPLICAS', '').split(',')), 1):
+    DATABASES[f'replica{number}'] = {
+        **DATABASES['default'],
+        'NAME' if DB_ENGINE == 'sqlite3' else 'HOST': replica.strip(),
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(f'replica{number}')
+DATABASE_ROUTERS = ['core.replicas.ReplicaRouter']
+
+
+# Cache
+# https://docs.djangoproject.com/en/3.2/topics/cache/
+
+# Pages and post cards live in the cache of each process, their keys
+# carry versions read from the 'shared' cache, which every process of
+# the site sees: memcached at CACHE_LOCATION (comma separated servers,
+# needs the optional pymemcache package) or, without it, files in
+# CACHE_DIR, which only processes of the same host share
+CACHE_LOCATION = os.environ.get('CACHE_LOCATION', '')
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'blogicum',
+    },
+    'shared': {
+        'BACKEND': 'django.core.cache.backends.memcached.PyMemcacheCache',
+        'LOCATION': CACHE_LOCATION.split(','),
+    } if CACHE_LOCATION else {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get('CACHE_DIR', BASE_DIR / 'cache'),
+        'OPTIONS': {'MAX_ENTRIES': 100000},
+    },
+}
+
+# With memcached at CACHE_LOCATION sessions are read from it and written
+# through to the database, so pages of logged in users do not query
+# django_session. Without it they are read from the database: a cache of
+# each process would keep accepting a session logged out in another one.
+# SESSION_ENGINE in the environment overrides both, e.g.
+# django.contrib.sessions.backends.signed_cookies keeps them in the
+# cookie only. Expired rows are removed by purge_expired_sessions
+SESSION_ENGINE = os.environ.get(
+    'SESSION_ENGINE', 'django.contrib.sessions.backends.cached_db'
+    if CACHE_LOCATION else 'django.contrib.sessions.backends.db')
+SESSION_CACHE_ALIAS = 'shared'
+
+
+# Image variants are rendered in background after saving, see
+# blog.images; turn off to render them in place
+BLOG_BACKGROUND_TASKS = True
+
+# The public read views are coroutines (see blog.mixins.AsyncViewMixin)
+# when BLOG_ASYNC_VIEWS is set, as blogicum.asgi does; under WSGI they
+# stay sync
+BLOG_ASYNC_VIEWS = os.environ.get('BLOG_ASYNC_VIEWS') == '1'
+# Async views run queries and rendering in the thread pool; turn off to
+# run them in the single thread shared with sync code
+BLOG_ASYNC_THREAD_POOL = True
+
+
+# Requests running more queries than the budget of their view (see
+# core.budget) fail with this on and are logged otherwise
+QUERY_BUDGET_RAISE = DEBUG
+
+
+# With memcached at CACHE_LOCATION users of authenticated requests are
+# loaded from it, see users.backends. ModelBackend stays listed, so
+# sessions started with it are still valid
+AUTHENTICATION_BACKENDS = ['django.contrib.auth.backends.ModelBackend']
+if CACHE_LOCATION:
+    AUTHENTICATION_BACKENDS.insert(0, 'users.backends.CachedUserBackend')
+
 
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
@@ -133,8 +224,22 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/3.2/howto/static-files/
 
 STATIC_URL = '/static/'
+# collectstatic writes hashed names with .gz/.br siblings (.br needs the
+# optional brotli package) here; core.static.serve_static serves them
+STATIC_ROOT = BASE_DIR / 'static'
+STATICFILES_STORAGE = 'core.static.CompressedManifestStaticFilesStorage'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
+# uploads are named by content and shared by identical ones, see blog.storage
+DEFAULT_FILE_STORAGE = 'blog.storage.ContentAddressedStorage'
+# media are served by blog.views.MediaView which checks access and hands
+# files off to the front server: 'X-Accel-Redirect' for nginx (with an
+# `internal` location at MEDIA_ACCEL_PREFIX aliased to MEDIA_ROOT) or
+# 'X-Sendfile' for Apache/lighttpd; None streams them from Django
+MEDIA_ACCEL_HEADER = None
+MEDIA_ACCEL_PREFIX = '/protected-media/'
+# chunks of resumable uploads are written here, see blog.uploads
+CHUNKED_UPLOAD_ROOT = MEDIA_ROOT / 'partial'
 
 # Tell django where to search static files
 STATICFILES_DIRS = [
@@ -152,5 +257,8 @@ LOGIN_REDIRECT_URL = 'blog:index'
 LOGOUT_REDIRECT_URL = 'blog:index'
 
 # E-mail specs
-EMAIL_BACKEND = "django.core.mail.backends.filebased.EmailBackend"
+# requests only queue messages, `send_queued_mail` delivers them through
+# EMAIL_DELIVERY_BACKEND; the file-based one writes a spool file per run
+EMAIL_BACKEND = "blog.mail.QueuedEmailBackend"
+EMAIL_DELIVERY_BACKEND = "django.core.mail.backends.filebased.EmailBackend"
 EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
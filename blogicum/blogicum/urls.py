@@ -14,10 +14,11 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 from django.contrib import admin
-from django.conf.urls.static import static
-from django.urls import path, include
+from django.urls import path, re_path, include
 
 from . import settings
+from blog.views import MediaView
+from core.static import serve_static
 from users.views import Registration
 
 
@@ -29,8 +30,14 @@ urlpatterns = [
     path('', include('blog.urls')),
     path('pages/', include('pages.urls')),
     path('auth/', include('django.contrib.auth.urls')),
-    path('auth/registration/', Registration.as_view(), name='registration')
-] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+    path('auth/registration/', Registration.as_view(), name='registration'),
+
+    # Uploaded files
+    re_path(rf'^{settings.MEDIA_URL.lstrip("/")}(?P<path>.+)$',
+            MediaView.as_view(), name='media'),
+    re_path(rf'^{settings.STATIC_URL.lstrip("/")}(?P<path>.+)$',
+            serve_static, name='static'),
+]
 
 
 handler403 = "pages.views.handle_403page"
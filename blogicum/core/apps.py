@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class CoreConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'core'
+
+    def ready(self) -> None:
+        """Connect signal receivers"""
+        from . import signals  # noqa: F401
@@ -0,0 +1,93 @@
+"""Query budgets of views.
+
+`query_budget(n)` declares the most queries one request to the view may
+run, counting everything the request does: middleware, the view and
+its template, on every database. Connections count their queries with
+`count_queries` (installed by `install_counter`) into the counter of the
+current request, so queries run in other threads by async views are
+counted too. `QueryBudgetMiddleware` logs an over-budget request, or
+raises `QueryBudgetExceeded` when QUERY_BUDGET_RAISE is set.
+"""
+import logging
+from contextvars import ContextVar
+from typing import Callable, Optional
+
+from django.conf import settings
+from django.utils.deprecation import MiddlewareMixin
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceeded(Exception):
+    """Raised when a request runs more queries than its view may"""
+
+
+class QueryCount:
+    """Queries run by a request and the budget of its view"""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.budget = None
+
+    def exceeded(self) -> bool:
+        return self.budget is not None and self.count > self.budget
+
+
+_current = ContextVar('query_count', default=None)
+
+
+def query_budget(limit: int) -> Callable:
+    """Declare the budget of a view function or class"""
+    def decorator(view):
+        view.query_budget = limit
+        return view
+    return decorator
+
+
+def get_budget(view_func: Callable) -> Optional[int]:
+    """Budget declared on the view function or its class"""
+    view_class = getattr(view_func, 'view_class', None)
+    return getattr(view_func, 'query_budget',
+                   getattr(view_class, 'query_budget', None))
+
+
+def count_queries(execute, sql, params, many, context):
+    """Execute wrapper adding the query to the current request count"""
+    counter = _current.get()
+    if counter is not None:
+        counter.count += 1
+    return execute(sql, params, many, context)
+
+
+def install_counter(connection) -> None:
+    """Make the connection count its queries"""
+    if count_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.append(count_queries)
+
+
+class QueryBudgetMiddleware(MiddlewareMixin):
+    """Compare queries of every request with the budget of its view.
+    Goes first in MIDDLEWARE, so queries of other middleware count too.
+    """
+
+    def process_request(self, request) -> None:
+        """Start counting; the count is kept as `request.query_count`"""
+        request.query_count = QueryCount()
+        _current.set(request.query_count)
+
+    def process_view(self, request, view_func, view_args,
+                     view_kwargs) -> None:
+        """Take the budget of the resolved view"""
+        request.query_count.budget = get_budget(view_func)
+
+    def process_response(self, request, response):
+        """Report the request if it went over the budget"""
+        counter = getattr(request, 'query_count', None)
+        _current.set(None)
+        if counter is not None and counter.exceeded():
+            message = (f'{request.method} {request.path}: {counter.count} '
+                       f'запросов при бюджете {counter.budget}')
+            if settings.QUERY_BUDGET_RAISE:
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+        return response
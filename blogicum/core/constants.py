@@ -5,3 +5,90 @@
 MAX_LENGTH_CHAR_FIELD = 256
 
 MAX_POSTS_COUNT = 10
+
+# size of the chunk processed by `recount_comments` command at once
+RECOUNT_CHUNK_SIZE = 1000
+
+MAX_COMMENTS_COUNT = 20
+
+# anonymous list pages are kept in cache no longer than this (seconds)
+PAGE_CACHE_TIMEOUT = 60 * 15
+
+# rendered post cards are kept in cache for this time (seconds)
+CARD_CACHE_TIMEOUT = 60 * 60 * 24
+
+# `publish_scheduled --loop` checks for due posts at least this often
+# (seconds) and handles at most SCHEDULE_BATCH_SIZE posts per transaction
+SCHEDULE_INTERVAL = 60
+SCHEDULE_BATCH_SIZE = 100
+
+# posts updated in one transaction when a category is (un)published
+VISIBILITY_BATCH_SIZE = 500
+
+# derived copies of post images: name -> bounding box (width, height)
+IMAGE_VARIANTS = {
+    'card': (640, 640),
+    'detail': (1280, 1280),
+}
+# formats of every variant: PIL format -> file extension
+IMAGE_VARIANT_FORMATS = {
+    'JPEG': 'jpg',
+    'WEBP': 'webp',
+}
+IMAGE_VARIANT_QUALITY = 80
+# size of the process pool rendering image variants
+IMAGE_WORKERS = 2
+# limits of uploaded post images, checked without decoding pixels
+IMAGE_MAX_SIZE = 10 * 1024 * 1024
+IMAGE_MAX_PIXELS = 40_000_000
+IMAGE_FORMATS = ('JPEG', 'PNG', 'GIF', 'WEBP')
+# `sizes` attribute of post images: cards are 40rem wide at most
+IMAGE_SIZES = '(max-width: 40rem) 100vw, 40rem'
+# nesting of content-addressed files: 2 gives ab/cd/<hash>.jpg
+STORAGE_SHARD_LEVELS = 2
+# browser cache lifetime of content-hashed media and static files, seconds
+IMMUTABLE_CACHE_TIMEOUT = 60 * 60 * 24 * 365
+# resumable uploads of post images, see blog.uploads
+UPLOAD_MAX_SIZE = IMAGE_MAX_SIZE
+UPLOAD_CHUNK_MAX_SIZE = 1024 * 1024
+UPLOAD_EXPIRY = 60 * 60 * 24
+# stylesheets built by the build_css command from the one below
+CSS_SOURCE = 'css/bootstrap.min.css'
+CSS_PURGED = 'css/bootstrap.purged.css'
+# inlined by base.html: rules used by the templates above the fold
+CSS_CRITICAL_TEMPLATE = 'includes/critical.css'
+CSS_CRITICAL_SOURCES = ('base.html', 'includes/header.html')
+# packages rendering markup with their own classes
+CSS_SCAN_PACKAGES = ('django_bootstrap5',)
+# queued e-mail: messages delivered over one connection at once, pause
+# of `send_queued_mail --loop` when the queue is empty (seconds),
+# failed deliveries after which a message is no longer retried and how
+# long a worker may deliver a claimed batch before others take it over
+EMAIL_BATCH_SIZE = 100
+EMAIL_QUEUE_INTERVAL = 5
+EMAIL_MAX_ATTEMPTS = 5
+EMAIL_CLAIM_TIMEOUT = 60 * 10
+# set on every new SQLite connection, see core.db; cache_size < 0 is KiB
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64 * 1024,
+    'busy_timeout': 5000,
+    'temp_store': 'MEMORY',
+}
+# transactions failing with "database is locked" are rerun up to
+# DB_LOCK_RETRIES times after a random pause of up to
+# DB_LOCK_BACKOFF * 2 ** attempt seconds, but not longer than the max
+DB_LOCK_RETRIES = 5
+DB_LOCK_BACKOFF = 0.05
+DB_LOCK_BACKOFF_MAX = 1.0
+# clients read from the primary database for this long after writing
+# (seconds), longer than the replication lag; local SQLite replicas are
+# refreshed by `sync_replicas --loop` this often (seconds)
+REPLICA_PIN_TIMEOUT = 10
+REPLICA_SYNC_INTERVAL = 1
+# expired sessions deleted by `purge_expired_sessions` in one statement
+SESSION_CLEANUP_BATCH_SIZE = 1000
+# snapshots of authenticated users are cached this long (seconds)
+USER_CACHE_TIMEOUT = 60 * 60
@@ -0,0 +1,100 @@
+"""Removal of unused CSS rules.
+
+A rule is kept when at least one of its selectors may match the markup:
+every class it requires occurs among the words of the scanned sources
+(templates and code rendering HTML). Element and attribute selectors
+are always kept, classes under `:not()` are not required. At-rules
+holding rules (@media, @supports) are purged recursively, other at-rules
+(@keyframes, @font-face) are kept whole.
+"""
+import re
+from pathlib import Path
+from typing import Iterable, List, Set, Tuple
+
+COMMENT = re.compile(r'/\*.*?\*/', re.S)
+LICENSE = re.compile(r'/\*!.*?\*/', re.S)
+NEGATION = re.compile(r':not\([^()]*(?:\([^()]*\)[^()]*)*\)')
+CLASS = re.compile(r'\.(-?[_a-zA-Z][\w-]*)')
+WORD = re.compile(r'[\w-]+')
+NESTED_AT_RULES = ('@media', '@supports', '@layer', '@container')
+
+
+def collect_words(paths: Iterable[Path]) -> Set[str]:
+    """Every word of the files: class names may be built anywhere"""
+    words = set()
+    for path in paths:
+        words.update(WORD.findall(path.read_text(encoding='utf-8')))
+    return words
+
+
+def _split_selectors(prelude: str) -> List[str]:
+    """Split a selector list by commas outside of parentheses"""
+    selectors, depth, start = [], 0, 0
+    for index, char in enumerate(prelude):
+        if char in '([':
+            depth += 1
+        elif char in ')]':
+            depth -= 1
+        elif char == ',' and depth == 0:
+            selectors.append(prelude[start:index])
+            start = index + 1
+    selectors.append(prelude[start:])
+    return selectors
+
+
+def _is_used(selector: str, words: Set[str]) -> bool:
+    return set(CLASS.findall(NEGATION.sub('', selector))) <= words
+
+
+def _blocks(css: str) -> Iterable[Tuple[str, str]]:
+    """Top level (prelude, body) pairs of a stylesheet"""
+    position = 0
+    while True:
+        opening = css.find('{', position)
+        if opening < 0:
+            return
+        depth, index = 1, opening + 1
+        while depth and index < len(css):
+            if css[index] == '{':
+                depth += 1
+            elif css[index] == '}':
+                depth -= 1
+            index += 1
+        yield css[position:opening].strip(), css[opening + 1:index - 1]
+        position = index
+
+
+def _purge_rules(css: str, words: Set[str]) -> str:
+    kept = []
+    for prelude, body in _blocks(css):
+        if ';' in prelude:
+            # statements such as @charset or @import come first
+            statements, prelude = prelude.rsplit(';', 1)
+            kept.append(f'{statements};')
+            prelude = prelude.strip()
+        if prelude.startswith(NESTED_AT_RULES):
+            body = _purge_rules(body, words)
+            if body:
+                kept.append(f'{prelude}{{{body}}}')
+        elif prelude.startswith('@'):
+            kept.append(f'{prelude}{{{body}}}')
+        else:
+            selectors = [selector for selector in _split_selectors(prelude)
+                         if _is_used(selector, words)]
+            if selectors:
+                kept.append(f'{",".join(selectors)}{{{body}}}')
+    return ''.join(kept)
+
+
+def purge_css(css: str, words: Set[str]) -> str:
+    """Return the stylesheet without rules matching none of `words`.
+    License comments are kept on top, other comments are dropped.
+    """
+    licenses = LICENSE.findall(css)
+    rules = _purge_rules(COMMENT.sub('', css), words)
+    charset = ''
+    if rules.startswith('@charset'):
+        # must stay the very first statement
+        charset, rules = rules.split(';', 1)
+        charset += ';'
+    return charset + '\n'.join(licenses + [rules])
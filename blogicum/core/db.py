@@ -0,0 +1,95 @@
+"""Database connections: SQLite tuning for concurrent use and health
+checks of persistent connections.
+
+Every new SQLite connection gets SQLITE_PRAGMAS: write-ahead log, so
+readers do not wait for the writer, `synchronous=NORMAL` (safe with
+WAL), memory-mapped reads, a bigger page cache and a busy timeout.
+A transaction which still finds the database locked (a deferred
+transaction whose snapshot went stale before its first write fails at
+once, without waiting) is rerun by `retry_on_lock` after a jittered
+exponential pause.
+
+Persistent connections (CONN_MAX_AGE) are checked as CONN_HEALTH_CHECKS
+of later Django versions check them: a request pings a connection it
+reuses right before its first query, see `install_health_check`, and
+connections a request does not use are never pinged.
+"""
+import random
+import time
+from functools import wraps
+from itertools import count
+
+from django.db import DEFAULT_DB_ALIAS, OperationalError, transaction
+from django.db import connections
+
+from core.constants import (DB_LOCK_BACKOFF, DB_LOCK_BACKOFF_MAX,
+                            DB_LOCK_RETRIES, SQLITE_PRAGMAS)
+
+
+def apply_pragmas(connection) -> None:
+    """Set SQLITE_PRAGMAS on the freshly opened connection"""
+    with connection.cursor() as cursor:
+        for name, value in SQLITE_PRAGMAS.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+
+
+def install_health_check(connection) -> None:
+    """Make the connection ping the server before its first cursor
+    after `expire_health_checks`; a broken one is closed, so the cursor
+    comes from a new connection. Transactions in progress are left alone.
+    """
+    if hasattr(connection, 'health_check_done'):
+        return
+    make_cursor = connection._cursor
+
+    def _cursor(*args, **kwargs):
+        if not connection.health_check_done:
+            connection.health_check_done = True
+            if (connection.connection is not None
+                    and not connection.in_atomic_block
+                    and not connection.is_usable()):
+                connection.close()
+        return make_cursor(*args, **kwargs)
+
+    connection.health_check_done = True
+    connection._cursor = _cursor
+
+
+def expire_health_checks() -> None:
+    """Check the connections of this thread again on their next use"""
+    for connection in connections.all():
+        if hasattr(connection, 'health_check_done'):
+            connection.health_check_done = False
+
+
+def is_lock_error(error: OperationalError) -> bool:
+    """Whether SQLite gave up waiting for a lock"""
+    return 'locked' in str(error)
+
+
+def lock_backoff(attempt: int) -> float:
+    """Pause before the retry: "full jitter" exponential backoff"""
+    return random.uniform(
+        0, min(DB_LOCK_BACKOFF_MAX, DB_LOCK_BACKOFF * 2 ** attempt))
+
+
+def retry_on_lock(func=None, *, using: str = DEFAULT_DB_ALIAS):
+    """Run `func` in a transaction, rerunning it while the database is
+    locked. Within an outer transaction the error is raised at once:
+    only the whole transaction may be retried.
+    """
+    if func is None:
+        return lambda func: retry_on_lock(func, using=using)
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        for attempt in count():
+            try:
+                with transaction.atomic(using=using):
+                    return func(*args, **kwargs)
+            except OperationalError as error:
+                if (not is_lock_error(error) or attempt >= DB_LOCK_RETRIES
+                        or connections[using].in_atomic_block):
+                    raise
+            time.sleep(lock_backoff(attempt))
+    return wrapper
@@ -0,0 +1,52 @@
+"""Form fields shared by the apps."""
+from typing import Iterable, Optional
+
+from django import forms
+from django.core.exceptions import ValidationError
+from django.core.files import File
+from django.template.defaultfilters import filesizeformat
+from PIL import Image
+
+from core.constants import IMAGE_FORMATS, IMAGE_MAX_PIXELS, IMAGE_MAX_SIZE
+from core.imaging import ImageRejected, probe_image
+
+
+class LimitedImageField(forms.ImageField):
+    """Image field checking size in bytes, resolution and format.
+    Unlike `forms.ImageField` it reads the image header only and never
+    walks through pixel data, so oversized files and decompression
+    bombs are rejected before they take CPU time and memory.
+    """
+
+    def __init__(self, *, max_size: int = IMAGE_MAX_SIZE,
+                 max_pixels: int = IMAGE_MAX_PIXELS,
+                 formats: Iterable[str] = IMAGE_FORMATS, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.max_size = max_size
+        self.max_pixels = max_pixels
+        self.formats = tuple(formats)
+
+    def to_python(self, data) -> Optional[File]:
+        """Probe the uploaded file instead of verifying the whole image"""
+        f = forms.FileField.to_python(self, data)
+        if f is None:
+            return None
+        if f.size > self.max_size:
+            raise ValidationError(
+                'Размер изображения должен быть не больше %(limit)s',
+                code='file_too_large',
+                params={'limit': filesizeformat(self.max_size)})
+        if hasattr(data, 'temporary_file_path'):
+            source = data.temporary_file_path()
+        else:
+            data.seek(0)
+            source = data
+        try:
+            image_format, *_ = probe_image(source, self.max_pixels,
+                                           self.formats)
+        except ImageRejected as error:
+            raise ValidationError(str(error), code='invalid_image')
+        f.content_type = Image.MIME.get(image_format)
+        if hasattr(f, 'seek') and callable(f.seek):
+            f.seek(0)
+        return f
@@ -1,9 +1,17 @@
 from typing import Optional, List, ContextManager
 
-from django.db.models.functions import Now
+from django.conf import settings
 from django.db.models import Q, QuerySet
 
 
+def published_query() -> Q:
+    """Return the predicate for posts visible to everyone.
+    It neither depends on current time nor joins categories: see
+    `Post.is_visible`, `blog.visibility` and `publish_scheduled` command.
+    """
+    return Q(is_visible=True)
+
+
 def filter_queryset(manager: ContextManager, related_objects: Optional[
         List[str]] = None, limit: Optional[int] = None, post_id: Optional[
             int] = None, user_id: Optional[int] = None,
@@ -31,8 +39,7 @@ def filter_queryset(manager: ContextManager, related_objects: Optional[
 
     # flag indicates return published and valid posts
     if valid_objects:
-        query &= Q(is_published=True, pub_date__lte=Now(),
-                   category__is_published=True)
+        query &= published_query()
 
     # two scenarios:
     # 1. got post_id and user_id optionall - return it but if its published.
@@ -50,3 +57,9 @@ def filter_queryset(manager: ContextManager, related_objects: Optional[
             queryset = queryset[:limit]
 
     return queryset
+
+
+def local_host() -> str:
+    """A host name the site accepts, for requests made in process"""
+    host = next(iter(settings.ALLOWED_HOSTS), '').lstrip('.')
+    return 'localhost' if host in ('', '*') else host
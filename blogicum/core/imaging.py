@@ -0,0 +1,60 @@
+"""Image processing without Django.
+
+The module must not import Django: it is loaded by freshly spawned
+processes of the pool in `blog.images`.
+"""
+import os
+import warnings
+from typing import BinaryIO, Dict, Iterable, Tuple, Union
+
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+
+class ImageRejected(Exception):
+    """Raised when an image breaks the limits of `probe_image`"""
+
+
+def probe_image(source: Union[str, BinaryIO], max_pixels: int,
+                formats: Iterable[str]) -> Tuple[str, int, int]:
+    """Return format, width and height of the image read from its
+    header only: pixel data is neither read nor decoded, so a
+    decompression bomb costs no more than a valid image.
+    """
+    formats = tuple(formats)
+    try:
+        with warnings.catch_warnings():
+            # the pixel limit is checked below, whatever Pillow's one is
+            warnings.simplefilter('ignore', Image.DecompressionBombWarning)
+            with Image.open(source, formats=formats) as image:
+                image_format, (width, height) = image.format, image.size
+    except Image.DecompressionBombError:
+        raise ImageRejected('Слишком большое разрешение изображения')
+    except (UnidentifiedImageError, OSError, SyntaxError, ValueError):
+        raise ImageRejected(
+            'Загрузите изображение в одном из форматов: '
+            + ', '.join(formats))
+    if width * height > max_pixels:
+        raise ImageRejected('Слишком большое разрешение изображения')
+    return image_format, width, height
+
+
+def render_variants(source: str, targets: Dict[str, Dict[str, str]],
+                    sizes: Dict[str, Tuple[int, int]],
+                    quality: int) -> Dict[str, Tuple[int, int]]:
+    """Downscale `source` image to every size and save it in every
+    format given by `targets` ({variant: {PIL format: path}}).
+    Return dimensions of every variant.
+    """
+    dimensions = {}
+    with Image.open(source) as original:
+        image = ImageOps.exif_transpose(original)
+        if image.mode not in ('RGB', 'L'):
+            image = image.convert('RGB')
+        for variant, paths in targets.items():
+            copy = image.copy()
+            copy.thumbnail(sizes[variant], Image.Resampling.LANCZOS)
+            for image_format, path in paths.items():
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                copy.save(path, image_format, quality=quality)
+            dimensions[variant] = copy.size
+    return dimensions
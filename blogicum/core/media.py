@@ -0,0 +1,158 @@
+"""Delivery of media and static files.
+
+Files are handed off to the front web server through
+`settings.MEDIA_ACCEL_HEADER`: X-Accel-Redirect (nginx, the file is
+looked up under the internal `MEDIA_ACCEL_PREFIX` location) or
+X-Sendfile (Apache, lighttpd; the absolute path is sent). Without it
+files are streamed by Django with Range support; WSGI servers providing
+`wsgi.file_wrapper` (e.g. gunicorn) send them with sendfile(2).
+"""
+import mimetypes
+import os
+import re
+from typing import Optional, Tuple
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import (FileResponse, Http404, HttpRequest, HttpResponse,
+                         HttpResponseNotModified)
+from django.utils._os import safe_join
+from django.utils.cache import patch_cache_control
+from django.utils.http import http_date, parse_http_date_safe
+from django.views.static import was_modified_since
+
+from core.constants import IMMUTABLE_CACHE_TIMEOUT
+
+# names given by content hash (see blog.storage) never change content
+HASHED_NAME = re.compile(r'(^|/)[0-9a-f]{64}(_\w+)?\.\w+$')
+RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class RangeNotSatisfiable(Exception):
+    """Raised when the requested range lies outside of the file"""
+
+
+class FileRange:
+    """File object limited to `length` bytes from its current position.
+    `fileno()` lets the WSGI file wrapper send the range with sendfile(2),
+    which stops at Content-Length.
+    """
+
+    def __init__(self, file, length: int) -> None:
+        self.file = file
+        self.remaining = length
+
+    def read(self, size: int = -1) -> bytes:
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self) -> int:
+        return self.file.fileno()
+
+    def close(self) -> None:
+        self.file.close()
+
+
+def parse_range(header: Optional[str],
+                size: int) -> Optional[Tuple[int, int]]:
+    """Return (start, end) of a single byte range, both inclusive, or
+    None when the whole file should be sent.
+    """
+    match = RANGE.match(header or '')
+    if match is None or match.groups() == ('', ''):
+        # multiple ranges are not supported: send the whole file
+        return None
+    first, last = match.groups()
+    if not first:
+        start, end = max(size - int(last), 0), size - 1
+    else:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise RangeNotSatisfiable
+    return start, end
+
+
+def serve_media(request: HttpRequest, name: str,
+                public: bool = True) -> HttpResponse:
+    """Respond with the media file `name` (relative to MEDIA_ROOT).
+    Content-hashed names are cached forever; others are revalidated.
+    """
+    try:
+        path = safe_join(settings.MEDIA_ROOT, name)
+    except (ValueError, SuspiciousFileOperation):
+        raise Http404('Файл не найден')
+    return serve_file(request, path, name, public=public,
+                      immutable=bool(HASHED_NAME.search(name)), accel=True)
+
+
+def serve_file(request: HttpRequest, path: str, name: str,
+               public: bool = True, immutable: bool = False,
+               accel: bool = False) -> HttpResponse:
+    """Respond with the file at `path` published under `name`.
+    Immutable files are cached forever; others are revalidated. `accel`
+    lets the front server send the file, see `MEDIA_ACCEL_HEADER`.
+    """
+    try:
+        stat = os.stat(path)
+    except (OSError, ValueError):
+        raise Http404('Файл не найден')
+    if not os.path.isfile(path):
+        raise Http404('Файл не найден')
+    if not was_modified_since(request.META.get('HTTP_IF_MODIFIED_SINCE'),
+                              stat.st_mtime, stat.st_size):
+        response = HttpResponseNotModified()
+    else:
+        response = _file_response(request, name, path, stat, accel)
+    if response.status_code == 416:
+        return response
+    response['Last-Modified'] = http_date(stat.st_mtime)
+    cache_control = {'public' if public else 'private': True}
+    if immutable:
+        cache_control.update(max_age=IMMUTABLE_CACHE_TIMEOUT, immutable=True)
+    else:
+        cache_control['no_cache'] = True
+    patch_cache_control(response, **cache_control)
+    return response
+
+
+def _file_response(request: HttpRequest, name: str, path: str,
+                   stat: os.stat_result, accel: bool) -> HttpResponse:
+    content_type = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+    header = getattr(settings, 'MEDIA_ACCEL_HEADER', None)
+    if accel and header:
+        # the front server answers Range requests itself
+        response = HttpResponse(content_type=content_type)
+        if header.lower() == 'x-accel-redirect':
+            response[header] = quote(
+                settings.MEDIA_ACCEL_PREFIX.rstrip('/') + '/' + name)
+        else:
+            response[header] = path
+        return response
+
+    if_range = request.META.get('HTTP_IF_RANGE')
+    # a range of a changed file would be garbage: send the whole file
+    stale = if_range and parse_http_date_safe(if_range) != int(stat.st_mtime)
+    try:
+        byte_range = None if stale else parse_range(
+            request.META.get('HTTP_RANGE'), stat.st_size)
+    except RangeNotSatisfiable:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{stat.st_size}'
+        return response
+    file = open(path, 'rb')
+    if byte_range is None:
+        response = FileResponse(file, content_type=content_type)
+    else:
+        start, end = byte_range
+        file.seek(start)
+        response = FileResponse(FileRange(file, end - start + 1),
+                                status=206, content_type=content_type)
+        response['Content-Length'] = end - start + 1
+        response['Content-Range'] = f'bytes {start}-{end}/{stat.st_size}'
+    response['Accept-Ranges'] = 'bytes'
+    return response
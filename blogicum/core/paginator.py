@@ -0,0 +1,153 @@
+"""Keyset (seek) pagination.
+
+Unlike `django.core.paginator.Paginator` it never runs COUNT and never
+uses OFFSET: every page is fetched with a `WHERE (key) < (cursor)`
+predicate, so the cost of a page does not depend on how deep it is.
+"""
+import json
+from typing import Any, Iterator, List, Optional, Sequence
+
+from django.core.exceptions import ValidationError
+from django.db.models import Model, Q, QuerySet
+from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
+
+
+class InvalidCursor(Exception):
+    """Raised when a cursor from the query string can not be decoded"""
+
+
+class KeysetPage:
+    """One page of a keyset paginated queryset.
+    Mimics the parts of `django.core.paginator.Page` used in templates.
+    """
+
+    def __init__(self, object_list: List[Model], paginator: 'KeysetPaginator',
+                 has_next: bool, has_previous: bool) -> None:
+        self.object_list = object_list
+        self.paginator = paginator
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __repr__(self) -> str:
+        return f'<KeysetPage of {len(self)} objects>'
+
+    def __len__(self) -> int:
+        return len(self.object_list)
+
+    def __iter__(self) -> Iterator[Model]:
+        return iter(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self) -> bool:
+        """Return 'True' if there are objects after this page"""
+        return self._has_next
+
+    def has_previous(self) -> bool:
+        """Return 'True' if there are objects before this page"""
+        return self._has_previous
+
+    def has_other_pages(self) -> bool:
+        """Return 'True' if the page is not the only one"""
+        return self._has_next or self._has_previous
+
+    @property
+    def next_cursor(self) -> Optional[str]:
+        """Cursor pointing to the last object of the page"""
+        if not self._has_next:
+            return None
+        return self.paginator.encode_cursor(self.object_list[-1])
+
+    @property
+    def previous_cursor(self) -> Optional[str]:
+        """Cursor pointing to the first object of the page"""
+        if not self._has_previous:
+            return None
+        return self.paginator.encode_cursor(self.object_list[0])
+
+
+class KeysetPaginator:
+    """Paginate a queryset by a unique ordering, e.g. ('-pub_date', 'id').
+    The last field of `ordering` must make the ordering unique.
+    """
+
+    def __init__(self, queryset: QuerySet, per_page: int,
+                 ordering: Sequence[str]) -> None:
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.ordering = tuple(ordering)
+        self._fields = [field.lstrip('-') for field in self.ordering]
+
+    def encode_cursor(self, obj: Model) -> str:
+        """Pack the ordering values of `obj` into an URL safe string"""
+        meta = self.queryset.model._meta
+        values = [meta.get_field(field).value_to_string(obj)
+                  for field in self._fields]
+        return urlsafe_base64_encode(json.dumps(values).encode())
+
+    def decode_cursor(self, cursor: str) -> List[Any]:
+        """Unpack ordering values from the cursor"""
+        try:
+            values = json.loads(urlsafe_base64_decode(cursor))
+            if len(values) != len(self._fields):
+                raise ValueError
+            meta = self.queryset.model._meta
+            return [meta.get_field(field).to_python(value)
+                    for field, value in zip(self._fields, values)]
+        except (ValueError, TypeError, ValidationError):
+            raise InvalidCursor(cursor)
+
+    def _seek(self, values: List[Any], forward: bool) -> Q:
+        """Build the row-value comparison `(fields) > (values)`
+        taking direction of every field into account.
+        """
+        query, equal = Q(), {}
+        for ordering, field, value in zip(self.ordering, self._fields,
+                                          values):
+            descending = ordering.startswith('-')
+            lookup = 'lt' if descending == forward else 'gt'
+            query |= Q(**equal, **{f'{field}__{lookup}': value})
+            equal[field] = value
+        # redundant range on the first field lets the database seek
+        # in the index instead of walking it from the start
+        ordering, field, value = self.ordering[0], self._fields[0], values[0]
+        lookup = 'lte' if ordering.startswith('-') == forward else 'gte'
+        return Q(**{f'{field}__{lookup}': value}) & query
+
+    @staticmethod
+    def _reverse(ordering: str) -> str:
+        return ordering[1:] if ordering.startswith('-') else f'-{ordering}'
+
+    def get_page_queryset(self, after: Optional[str] = None,
+                          before: Optional[str] = None) -> QuerySet:
+        """Return the sliced queryset for the page following `after` or
+        preceding `before` cursor. One extra row is fetched to tell
+        whether there is anything beyond the page.
+        """
+        queryset = self.queryset
+        if before:
+            queryset = queryset.filter(
+                self._seek(self.decode_cursor(before), forward=False)
+            ).order_by(*map(self._reverse, self.ordering))
+        else:
+            if after:
+                queryset = queryset.filter(
+                    self._seek(self.decode_cursor(after), forward=True))
+            queryset = queryset.order_by(*self.ordering)
+        return queryset[:self.per_page + 1]
+
+    def page(self, after: Optional[str] = None,
+             before: Optional[str] = None) -> KeysetPage:
+        """Return the page following `after` or preceding `before` cursor,
+        the first page when no cursor given.
+        """
+        object_list = list(self.get_page_queryset(after, before))
+        has_more = len(object_list) > self.per_page
+        object_list = object_list[:self.per_page]
+        if before:
+            object_list.reverse()
+            return KeysetPage(object_list, self, has_next=True,
+                              has_previous=has_more)
+        return KeysetPage(object_list, self, has_next=has_more,
+                          has_previous=bool(after))
@@ -0,0 +1,80 @@
+"""Read replicas.
+
+Queries made within `replica_reads()` (public pages, see
+`blog.mixins.ReplicaReadMixin`) go to one alias of DATABASE_REPLICAS,
+picked at random for the whole block, so a page never mixes replicas
+lagging behind by different time. Everything else goes to the primary.
+A client that has just written gets the PRIMARY_COOKIE for
+REPLICA_PIN_TIMEOUT seconds and reads from the primary meanwhile, so
+replication lag never hides its own changes. For local SQLite replicas
+`copy_sqlite` is the replication, see the `sync_replicas` command.
+"""
+import random
+import sqlite3
+from contextlib import closing, contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.deprecation import MiddlewareMixin
+
+from core.constants import REPLICA_PIN_TIMEOUT
+
+PRIMARY_COOKIE = 'db_primary'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+
+_replica = ContextVar('replica', default=None)
+
+
+@contextmanager
+def replica_reads():
+    """Route reads of the block to a replica"""
+    token = _replica.set(random.choice(settings.DATABASE_REPLICAS)
+                         if settings.DATABASE_REPLICAS else None)
+    try:
+        yield
+    finally:
+        _replica.reset(token)
+
+
+class ReplicaRouter:
+    """Database router sending reads within `replica_reads()` to the
+    replicas and all writes to the primary
+    """
+
+    def db_for_read(self, model, **hints):
+        """The replica of the block, if the reads may be served by one"""
+        return _replica.get()
+
+    def db_for_write(self, model, **hints) -> str:
+        """Replicas are read-only"""
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints) -> bool:
+        """Every database holds the same data"""
+        return True
+
+    def allow_migrate(self, db, app_label, **hints) -> bool:
+        """Replicas get the schema from the primary"""
+        return db not in settings.DATABASE_REPLICAS
+
+
+class PrimaryAfterWriteMiddleware(MiddlewareMixin):
+    """Pin the reads of a client which has written to the primary"""
+
+    def process_response(self, request, response):
+        """Set the cookie after a successful unsafe request"""
+        if (settings.DATABASE_REPLICAS
+                and request.method not in SAFE_METHODS
+                and response.status_code < 400):
+            response.set_cookie(PRIMARY_COOKIE, '1',
+                                max_age=REPLICA_PIN_TIMEOUT,
+                                httponly=True, samesite='Lax')
+        return response
+
+
+def copy_sqlite(source: str, target: str) -> None:
+    """Copy a live SQLite database consistently by the backup API"""
+    with closing(sqlite3.connect(source)) as primary, \
+            closing(sqlite3.connect(target)) as replica:
+        primary.backup(replica)
@@ -0,0 +1,31 @@
+from django.core.signals import request_started
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+from .budget import install_counter
+from .db import apply_pragmas, expire_health_checks, install_health_check
+
+
+@receiver(connection_created)
+def tune_sqlite(sender, connection, **kwargs) -> None:
+    """Switch SQLite connections to WAL and the other pragmas"""
+    if connection.vendor == 'sqlite':
+        apply_pragmas(connection)
+
+
+@receiver(connection_created)
+def check_connection_health(sender, connection, **kwargs) -> None:
+    """Ping persistent connections before a request reuses them"""
+    install_health_check(connection)
+
+
+@receiver(connection_created)
+def count_connection_queries(sender, connection, **kwargs) -> None:
+    """Count queries against the budget of the request"""
+    install_counter(connection)
+
+
+@receiver(request_started)
+def check_database_connections(sender, **kwargs) -> None:
+    """Do not let a request reuse a broken persistent connection"""
+    expire_health_checks()
@@ -0,0 +1,119 @@
+"""Hashed and precompressed static files.
+
+`collectstatic` with `CompressedManifestStaticFilesStorage` writes every
+asset under a content-hashed name and, for text assets, its `.gz`
+sibling and a `.br` one when the optional `brotli` package is
+installed. `serve_static` picks the sibling matching Accept-Encoding;
+hashed names are cached by browsers forever.
+"""
+import gzip
+import os
+import re
+from typing import Optional, Tuple
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.contrib.staticfiles.storage import (ManifestStaticFilesStorage,
+                                                staticfiles_storage)
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.base import ContentFile
+from django.http import Http404, HttpRequest, HttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import patch_vary_headers
+
+from core.media import serve_file
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE = ('.css', '.js', '.svg', '.ico', '.txt', '.json', '.xml',
+                '.html', '.map')
+# preferred first: (Content-Encoding, file extension)
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+ACCEPT_ENCODING = re.compile(r'([\w*-]+)\s*(?:;\s*q=([01](?:\.\d*)?))?')
+
+
+def _compressors():
+    yield '.gz', lambda content: gzip.compress(content, 9, mtime=0)
+    if brotli is not None:
+        yield '.br', lambda content: brotli.compress(content)
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Manifest storage writing compressed siblings of hashed files"""
+
+    def post_process(self, paths, dry_run=False, **options):
+        """Compress the final hashed files once they are all written"""
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        for name in set(self.hashed_files.values()):
+            if name.endswith(COMPRESSIBLE):
+                self.compress(name)
+
+    def compress(self, name: str) -> None:
+        """Save compressed copies which are smaller than the file"""
+        with self.open(name) as file:
+            content = file.read()
+        for extension, compress in _compressors():
+            compressed = compress(content)
+            if len(compressed) >= len(content):
+                continue
+            if self.exists(name + extension):
+                self.delete(name + extension)
+            self._save(name + extension, ContentFile(compressed))
+
+    def stored_name(self, name: str) -> str:
+        """Fall back to the plain name until collectstatic is run, e.g.
+        in development where files are found by the finders
+        """
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            return name
+
+
+def accepted_encodings(header: Optional[str]) -> set:
+    """Codings the client accepts (q > 0)"""
+    accepted = set()
+    for coding, quality in ACCEPT_ENCODING.findall(header or ''):
+        if not quality or float(quality) > 0:
+            accepted.add(coding.lower())
+    return accepted
+
+
+def negotiate(request: HttpRequest, path: str) -> Tuple[str, Optional[str]]:
+    """Path of the best precompressed sibling and its Content-Encoding"""
+    accepted = accepted_encodings(request.META.get('HTTP_ACCEPT_ENCODING'))
+    for encoding, extension in ENCODINGS:
+        if encoding in accepted or '*' in accepted:
+            if os.path.isfile(path + extension):
+                return path + extension, encoding
+    return path, None
+
+
+def serve_static(request: HttpRequest, path: str) -> HttpResponse:
+    """Serve a collected static file, or the source one found by the
+    finders before collectstatic is run
+    """
+    try:
+        full_path = safe_join(settings.STATIC_ROOT or '', path)
+    except (ValueError, SuspiciousFileOperation):
+        raise Http404('Файл не найден')
+    if not settings.STATIC_ROOT or not os.path.isfile(full_path):
+        full_path = finders.find(path)
+        if full_path is None:
+            raise Http404('Файл не найден')
+    immutable = path in getattr(staticfiles_storage, 'hashed_files',
+                                {}).values()
+    encoding = None
+    if path.endswith(COMPRESSIBLE):
+        full_path, encoding = negotiate(request, full_path)
+    response = serve_file(request, full_path, path, immutable=immutable)
+    if encoding is not None and response.status_code in (200, 206):
+        response['Content-Encoding'] = encoding
+    if path.endswith(COMPRESSIBLE):
+        patch_vary_headers(response, ('Accept-Encoding',))
+    return response
@@ -1,13 +1,17 @@
 from django.views.generic import TemplateView
 from django.shortcuts import render
 
+from core.budget import query_budget
 
+
+@query_budget(4)
 class RulesView(TemplateView):
     """Generate page with project rules"""
 
     template_name = 'pages/rules.html'
 
 
+@query_budget(4)
 class AboutView(TemplateView):
     """Generate page with info about us"""
 
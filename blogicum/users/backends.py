@@ -0,0 +1,80 @@
+"""Authentication backend keeping users in the cache.
+
+`AuthenticationMiddleware` loads the user of every authenticated
+request. `CachedUserBackend` keeps a compact snapshot of the user row
+(the values of its concrete fields) in the 'shared' cache, so these
+requests skip the `auth_user` query. Saving or deleting a user drops the
+snapshot once the change is committed, see `users.signals`. The cache is
+shared so that the drop is seen by every process: the backend is only
+enabled when it is memcached.
+
+The password hash is not kept in the snapshot, only the session hash
+derived from it: a cached user loads its password on first access. The
+key carries a version derived from the field names, so snapshots of
+another schema are never read.
+"""
+import hashlib
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS
+
+from core.constants import USER_CACHE_TIMEOUT
+
+User = get_user_model()
+
+SNAPSHOT_CACHE = 'shared'
+
+FIELDS = [field.attname for field in User._meta.concrete_fields
+          if field.attname != 'password']
+VERSION = hashlib.md5(','.join(FIELDS).encode()).hexdigest()[:8]
+
+
+def snapshot_key(user_id) -> str:
+    """Cache key of the user snapshot"""
+    return f'users:user:{user_id}:{VERSION}'
+
+
+def forget_user(user_id) -> None:
+    """Drop the snapshot, the next request loads the user again"""
+    caches[SNAPSHOT_CACHE].delete(snapshot_key(user_id))
+
+
+def take_snapshot(user) -> list:
+    """Values of the fields followed by the session hash of the user"""
+    return ([getattr(user, name) for name in FIELDS]
+            + [user.get_session_auth_hash()])
+
+
+def restore_snapshot(values: list):
+    """User with a deferred password checking sessions by the cached
+    hash until the password is loaded or changed
+    """
+    *values, session_hash = values
+    user = User.from_db(DEFAULT_DB_ALIAS, FIELDS, values)
+    get_session_auth_hash = user.get_session_auth_hash
+
+    def cached_session_auth_hash() -> str:
+        if 'password' in user.get_deferred_fields():
+            return session_hash
+        return get_session_auth_hash()
+    user.get_session_auth_hash = cached_session_auth_hash
+    return user
+
+
+class CachedUserBackend(ModelBackend):
+    """`ModelBackend` loading users from their cached snapshots"""
+
+    def get_user(self, user_id):
+        """Build the user from the snapshot, cache it on a miss"""
+        cache = caches[SNAPSHOT_CACHE]
+        values = cache.get(snapshot_key(user_id))
+        if values is None:
+            user = super().get_user(user_id)
+            if user is not None:
+                cache.set(snapshot_key(user_id), take_snapshot(user),
+                          USER_CACHE_TIMEOUT)
+            return user
+        user = restore_snapshot(values)
+        return user if self.user_can_authenticate(user) else None
@@ -1,5 +1,6 @@
 import os
 import re
+import threading
 import time
 from http import HTTPStatus
 from inspect import getsource
@@ -41,6 +42,20 @@ def enable_debug_false():
         yield
 
 
+@pytest.fixture(autouse=True)
+def run_background_tasks_in_place():
+    with override_settings(BLOG_BACKGROUND_TASKS=False):
+        yield
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    from django.core.cache import caches
+    for cache in caches.all():
+        cache.clear()
+    yield
+
+
 class SafeImportFromContextManager:
     def __init__(
             self,
@@ -334,6 +349,26 @@ def restore_cleaned_data(cleaned_data: dict) -> dict:
     return cleaned_data_fixed
 
 
+def get_in_thread(client: Client, url: str, **extra) -> HttpResponse:
+    """Make the request from another thread with its own database
+    connection, as a request served by another worker process meanwhile
+    """
+    from django.db import connection
+
+    responses = []
+
+    def get() -> None:
+        try:
+            responses.append(client.get(url, **extra))
+        finally:
+            connection.close()
+    thread = threading.Thread(target=get)
+    thread.start()
+    thread.join()
+    assert responses, f"Запрос к `{url}` в другом потоке завершился ошибкой."
+    return responses[0]
+
+
 def squash_code(code: str) -> str:
     result = re.sub(r"#.+", "", code)
     result = result.replace("\n", "").replace(" ", "")
@@ -363,6 +398,8 @@ def cleanup(request):
                     filename.endswith(".jpg")
                     or filename.endswith(".gif")
                     or filename.endswith(".png")
+                    or filename.endswith(".webp")
+                    or filename.endswith(".part")
             ):
                 file_path = os.path.join(root, filename)
                 if os.path.getmtime(file_path) >= start_time:
@@ -0,0 +1,95 @@
+import asyncio
+import importlib
+import threading
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.core.management import call_command
+from django.test import AsyncClient, override_settings
+from django.urls import clear_url_caches, resolve
+
+import blog.mixins
+
+
+def rebuild_urls():
+    for name in ('blog.urls', settings.ROOT_URLCONF):
+        importlib.reload(importlib.import_module(name))
+    clear_url_caches()
+
+
+@pytest.fixture
+def asgi_views():
+    """Views built as the ASGI entry point builds them, with the pool"""
+    try:
+        with override_settings(BLOG_ASYNC_VIEWS=True,
+                               BLOG_ASYNC_THREAD_POOL=True):
+            rebuild_urls()
+            yield
+    finally:
+        rebuild_urls()
+
+
+@pytest.fixture
+def read_urls(post_with_published_location):
+    post = post_with_published_location
+    return ('/', f'/posts/{post.pk}/', f'/category/{post.category.slug}/',
+            f'/profile/{post.author.username}/')
+
+
+@pytest.mark.django_db
+def test_read_views_stay_sync_under_wsgi(read_urls):
+    for url in read_urls:
+        assert not asyncio.iscoroutinefunction(resolve(url).func), (
+            f"Убедитесь, что под WSGI представление страницы `{url}`"
+            " остаётся синхронным."
+        )
+
+
+@pytest.mark.django_db
+def test_read_views_are_async(asgi_views, read_urls):
+    for url in read_urls:
+        assert asyncio.iscoroutinefunction(resolve(url).func), (
+            f"Убедитесь, что представление страницы `{url}` асинхронное."
+        )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_read_views_in_thread_pool(
+        asgi_views, read_urls, post_with_published_location, monkeypatch):
+    threads = []
+    respond = blog.mixins._respond
+
+    def respond_in_thread(*args, **kwargs):
+        threads.append(threading.current_thread())
+        return respond(*args, **kwargs)
+
+    monkeypatch.setattr(blog.mixins, '_respond', respond_in_thread)
+    client = AsyncClient()
+    for url in read_urls:
+        response = async_to_sync(client.get)(url)
+        assert response.status_code == 200, (
+            f"Убедитесь, что страница `{url}` отдаётся через ASGI."
+        )
+        assert post_with_published_location.title in (
+            response.content.decode('utf-8'))
+        assert response.asgi_request.query_count.count > 0, (
+            "Убедитесь, что запросы, выполненные в пуле потоков,"
+            " учитываются в бюджете запросов."
+        )
+    assert len(threads) == len(read_urls) and threading.main_thread() not in (
+        threads), (
+        "Убедитесь, что асинхронные представления выполняются в пуле"
+        " потоков."
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_bench_handlers(post_with_published_location, capsys):
+    call_command('bench_handlers', requests=8, clients=4, threads=2,
+                 client_delay=0)
+    output = capsys.readouterr().out
+    assert 'WSGI' in output and 'ASGI' in output
+    assert 'ошибок: 0' in output, (
+        "Убедитесь, что все запросы бенчмарка выполняются успешно."
+    )
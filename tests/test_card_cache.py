@@ -0,0 +1,34 @@
+import pytest
+from django.core.cache import cache
+
+from blog.models import Post
+from blog.templatetags.blog_tags import card_cache_key
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_post_cards_are_cached(user_client, post_with_published_location):
+    post = post_with_published_location
+    user_client.get('/')
+    post.refresh_from_db()
+    assert cache.get(card_cache_key(post)), (
+        "Убедитесь, что отрисованная карточка публикации сохраняется в кэше."
+    )
+
+
+def test_card_key_follows_post_version(mixer, post_with_published_location):
+    post = post_with_published_location
+    key = card_cache_key(post)
+
+    Post.shift_comment_count(post.pk, 1)
+    post.refresh_from_db()
+    assert card_cache_key(post) != key, (
+        "Убедитесь, что ключ карточки меняется вместе со счётчиком"
+        " комментариев."
+    )
+
+    key = card_cache_key(post)
+    post.category.is_published = False
+    assert card_cache_key(post) != key, (
+        "Убедитесь, что ключ карточки зависит от публикации категории."
+    )
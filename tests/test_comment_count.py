@@ -0,0 +1,88 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from blog.models import Comment, Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_comment_count_follows_views(
+        user_client, post_with_published_location):
+    post = post_with_published_location
+    user_client.post(
+        reverse('blog:add_comment', args=[post.id]), {'text': 'Текст'})
+    post.refresh_from_db()
+    assert post.comment_count == 1, (
+        "Убедитесь, что при создании комментария увеличивается счётчик"
+        " комментариев публикации."
+    )
+
+    comment = Comment.objects.get(post=post)
+    user_client.post(
+        reverse('blog:delete_comment', args=[post.id, comment.id]))
+    post.refresh_from_db()
+    assert post.comment_count == 0, (
+        "Убедитесь, что при удалении комментария уменьшается счётчик"
+        " комментариев публикации."
+    )
+
+
+def test_comment_count_follows_any_deletion(
+        mixer, user, another_user, post_with_published_location):
+    post = post_with_published_location
+    mixer.cycle(2).blend('blog.Comment', post=post, author=user)
+    mixer.cycle(3).blend('blog.Comment', post=post, author=another_user)
+    post.refresh_from_db()
+    assert post.comment_count == 5, (
+        "Убедитесь, что счётчик комментариев учитывает комментарии,"
+        " созданные не через представления."
+    )
+
+    another_user.delete()
+    post.refresh_from_db()
+    assert post.comment_count == 2, (
+        "Убедитесь, что счётчик комментариев уменьшается при каскадном"
+        " удалении комментариев."
+    )
+
+    Comment.objects.filter(post=post).delete()
+    post.refresh_from_db()
+    assert post.comment_count == 0, (
+        "Убедитесь, что счётчик комментариев уменьшается при удалении"
+        " комментариев через QuerySet.delete()."
+    )
+
+
+def test_post_deletion_does_not_depend_on_comments(mixer, user):
+    def delete_queries(comments: int) -> int:
+        post = mixer.blend('blog.Post', author=user)
+        mixer.cycle(comments).blend('blog.Comment', post=post)
+        with CaptureQueriesContext(connection) as queries:
+            post.delete()
+        return len(queries)
+
+    assert delete_queries(1) == delete_queries(5), (
+        "Убедитесь, что число запросов при удалении публикации не зависит"
+        " от количества её комментариев."
+    )
+    assert not Post.objects.exists() and not Comment.objects.exists()
+
+
+def test_recount_comments_repairs_counters(
+        mixer, post_with_published_location):
+    post = post_with_published_location
+    mixer.cycle(3).blend('blog.Comment', post=post)
+    Post.objects.filter(pk=post.pk).update(comment_count=42)
+
+    call_command('recount_comments', chunk_size=1, stdout=StringIO())
+
+    post.refresh_from_db()
+    assert post.comment_count == 3, (
+        "Убедитесь, что команда `recount_comments` исправляет устаревшие"
+        " счётчики комментариев."
+    )
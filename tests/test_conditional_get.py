@@ -0,0 +1,90 @@
+import pytest
+from django.core.cache import caches
+from django.db import transaction
+
+from conftest import get_in_thread
+
+pytestmark = [pytest.mark.django_db(transaction=True)]
+
+
+def _urls(post):
+    return ('/', f'/category/{post.category.slug}/',
+            f'/profile/{post.author.username}/', f'/posts/{post.id}/')
+
+
+@pytest.mark.parametrize('client_fixture', ['unlogged_client', 'user_client'])
+def test_not_modified(request, client_fixture, post_with_published_location):
+    client = request.getfixturevalue(client_fixture)
+    for url in _urls(post_with_published_location):
+        # the first visit may set CSRF cookie which is a part of ETag
+        client.get(url)
+        etag = client.get(url)['ETag']
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304, (
+            f"Убедитесь, что страница `{url}` отвечает 304, если не"
+            " изменилась."
+        )
+
+
+def test_modified_after_comment(
+        mixer, unlogged_client, post_with_published_location):
+    post = post_with_published_location
+    etags = {url: unlogged_client.get(url)['ETag'] for url in _urls(post)}
+    mixer.blend('blog.Comment', post=post)
+    for url, etag in etags.items():
+        response = unlogged_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            f"Убедитесь, что новый комментарий меняет ETag страницы `{url}`."
+        )
+
+
+def test_modified_after_commit(
+        mixer, unlogged_client, post_with_published_location):
+    post = post_with_published_location
+    etags = {url: unlogged_client.get(url)['ETag'] for url in _urls(post)}
+    with transaction.atomic():
+        mixer.blend('blog.Comment', post=post, text='Новый комментарий')
+        for url, etag in etags.items():
+            response = get_in_thread(unlogged_client, url,
+                                     HTTP_IF_NONE_MATCH=etag)
+            assert response.status_code == 304, (
+                f"Убедитесь, что до фиксации транзакции страница `{url}`"
+                " считается неизменной."
+            )
+    response = unlogged_client.get(
+        f'/posts/{post.id}/', HTTP_IF_NONE_MATCH=etags[f'/posts/{post.id}/'])
+    assert response.status_code == 200 and 'Новый комментарий' in (
+        response.content.decode('utf-8')), (
+        "Убедитесь, что после фиксации транзакции страница отдаётся"
+        " заново с новым содержимым."
+    )
+
+
+def test_etag_depends_on_user(
+        user_client, another_user_client, post_with_published_location):
+    url = f'/posts/{post_with_published_location.id}/'
+    etag = user_client.get(url)['ETag']
+    response = another_user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+
+
+def test_validators_are_shared_by_processes(
+        mixer, unlogged_client, post_with_published_location):
+    post = post_with_published_location
+    etags = {url: unlogged_client.get(url)['ETag'] for url in _urls(post)}
+    # another worker process starts with an empty cache of its own
+    caches['default'].clear()
+    for url, etag in etags.items():
+        response = unlogged_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304, (
+            f"Убедитесь, что ETag страницы `{url}` одинаков во всех"
+            " процессах."
+        )
+    mixer.blend('blog.Comment', post=post)
+    caches['default'].clear()
+    for url, etag in etags.items():
+        response = unlogged_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            f"Убедитесь, что изменение, сделанное в другом процессе, меняет"
+            f" ETag страницы `{url}`."
+        )
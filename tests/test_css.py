@@ -0,0 +1,54 @@
+import pytest
+from django.core.management import call_command
+from django.templatetags.static import static
+
+from core.css import purge_css
+
+CSS = (
+    '@charset "UTF-8";/*! license */:root{--x:1}'
+    '.used{a:1}.unused{b:2}.used,.unused{c:3}body{d:4}'
+    '.btn:not(.unused){e:5}'
+    '@media (min-width:1px){.unused{f:6}.used .also{g:7}}'
+    '@keyframes spin{to{transform:rotate(1turn)}}'
+)
+
+
+def test_purge_css():
+    purged = purge_css(CSS, {'used', 'btn'})
+    assert purged.startswith('@charset "UTF-8";/*! license */'), (
+        "Убедитесь, что @charset и лицензия остаются в начале таблицы"
+        " стилей."
+    )
+    assert '.used{a:1}' in purged and 'body{d:4}' in purged, (
+        "Убедитесь, что используемые правила и правила для элементов"
+        " сохраняются."
+    )
+    assert '.unused' not in purged.replace(':not(.unused)', ''), (
+        "Убедитесь, что правила с неиспользуемыми классами удаляются."
+    )
+    assert '.used{c:3}' in purged, (
+        "Убедитесь, что из списка селекторов удаляются только"
+        " неиспользуемые."
+    )
+    assert '@media' not in purged, (
+        "Убедитесь, что опустевшие @media удаляются."
+    )
+    assert '@keyframes spin{to{transform:rotate(1turn)}}' in purged
+
+
+def test_built_css_is_current():
+    call_command('build_css', check=True)
+
+
+@pytest.mark.django_db
+def test_base_inlines_critical_css(client):
+    content = client.get('/').content.decode('utf-8')
+    assert '<style>' in content and '.navbar{' in content, (
+        "Убедитесь, что критический CSS встроен в base.html."
+    )
+    purged = static('css/bootstrap.purged.css')
+    assert f'rel="preload" href="{purged}"' in content, (
+        "Убедитесь, что очищенная таблица стилей загружается без"
+        " блокировки отрисовки."
+    )
+    assert static('css/bootstrap.min.css') not in content
@@ -0,0 +1,56 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from core.constants import MAX_COMMENTS_COUNT
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _count_detail_queries(client, post):
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(f'/posts/{post.id}/')
+    assert response.status_code == 200
+    return len(ctx.captured_queries)
+
+
+def test_detail_queries_do_not_depend_on_comments(
+        mixer, user_client, post_with_published_location):
+    post = post_with_published_location
+    mixer.blend('blog.Comment', post=post)
+    # the first request warms the caches
+    _count_detail_queries(user_client, post)
+    few = _count_detail_queries(user_client, post)
+    mixer.cycle(5).blend('blog.Comment', post=post)
+    many = _count_detail_queries(user_client, post)
+    assert few == many, (
+        "Убедитесь, что число запросов страницы публикации не зависит от"
+        " количества комментариев."
+    )
+
+
+def test_hidden_post_visible_to_author_only(
+        user_client, another_user_client, mixer, user):
+    post = mixer.blend('blog.Post', author=user, is_published=False)
+    assert user_client.get(f'/posts/{post.id}/').status_code == 200
+    assert another_user_client.get(f'/posts/{post.id}/').status_code == 404
+
+
+def test_comments_are_loaded_in_batches(
+        mixer, user_client, post_with_published_location):
+    post = post_with_published_location
+    comments = mixer.cycle(MAX_COMMENTS_COUNT + 5).blend(
+        'blog.Comment', post=post)
+    page = user_client.get(f'/posts/{post.id}/').context['comments']
+    assert len(page) == MAX_COMMENTS_COUNT, (
+        "Убедитесь, что на странице публикации выводится только первая"
+        " порция комментариев."
+    )
+    response = user_client.get(
+        f'/posts/{post.id}/comments/?after={page.next_cursor}')
+    rest = response.context['comments']
+    assert [c.id for c in page] + [c.id for c in rest] == [
+        c.id for c in comments], (
+        "Убедитесь, что следующая порция комментариев продолжает предыдущую."
+    )
+    assert not rest.has_next()
@@ -0,0 +1,16 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_feed_queries_use_indexes(many_posts_with_published_locations):
+    try:
+        call_command('explain_feeds', stdout=StringIO())
+    except Exception as e:
+        raise AssertionError(
+            "Убедитесь, что запросы лент публикаций используют индексы и не"
+            f" требуют сортировки:\n{e}"
+        )
@@ -0,0 +1,110 @@
+import os
+import struct
+import tracemalloc
+import zlib
+from io import BytesIO
+
+import pytest
+from PIL import Image
+from django import forms
+from django.core.files.uploadedfile import (InMemoryUploadedFile,
+                                            SimpleUploadedFile)
+from django.utils import timezone
+
+from blog.models import Post
+from core.fields import LimitedImageField
+
+
+def png_chunk(kind: bytes, data: bytes) -> bytes:
+    return (struct.pack('>I', len(data)) + kind + data
+            + struct.pack('>I', zlib.crc32(kind + data)))
+
+
+def crafted_png(width: int, height: int) -> bytes:
+    """Valid PNG header declaring any resolution, almost no pixel data"""
+    header = struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)
+    return (b'\x89PNG\r\n\x1a\n' + png_chunk(b'IHDR', header)
+            + png_chunk(b'IDAT', zlib.compress(b'\0' * 1024))
+            + png_chunk(b'IEND', b''))
+
+
+def encoded(image: Image.Image, image_format: str) -> bytes:
+    image_io = BytesIO()
+    image.save(image_io, image_format, compress_level=0)
+    return image_io.getvalue()
+
+
+class CountingFile(BytesIO):
+    """Remembers how many bytes have been read"""
+
+    bytes_read = 0
+
+    def read(self, size=-1):
+        data = super().read(size)
+        self.bytes_read += len(data)
+        return data
+
+
+def upload(content: bytes, name: str = 'image.png') -> SimpleUploadedFile:
+    return SimpleUploadedFile(name, content)
+
+
+@pytest.mark.parametrize('width, height', [(10000, 5000), (60000, 60000)])
+def test_decompression_bomb_rejected(width, height):
+    with pytest.raises(forms.ValidationError, match='разрешение'):
+        LimitedImageField().clean(upload(crafted_png(width, height)))
+
+
+def test_limits():
+    png = encoded(Image.new('RGB', (200, 200)), 'PNG')
+    assert LimitedImageField().clean(upload(png)).content_type == (
+        'image/png')
+    with pytest.raises(forms.ValidationError, match='Размер'):
+        LimitedImageField(max_size=len(png) - 1).clean(upload(png))
+    with pytest.raises(forms.ValidationError, match='разрешение'):
+        LimitedImageField(max_pixels=199 * 200).clean(upload(png))
+    bmp = encoded(Image.new('RGB', (20, 20)), 'BMP')
+    with pytest.raises(forms.ValidationError, match='форматов'):
+        LimitedImageField().clean(upload(bmp, 'image.bmp'))
+
+
+def validate(field: forms.Field, content: bytes):
+    """Return bytes read and peak memory taken by the validation"""
+    file = CountingFile(content)
+    tracemalloc.start()
+    field.clean(InMemoryUploadedFile(file, 'image', 'image.png', 'image/png',
+                                     len(content), None))
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return file.bytes_read, peak
+
+
+def test_validation_reads_header_only():
+    """Benchmark against the default `forms.ImageField`"""
+    noise = Image.frombytes('RGB', (1200, 1200), os.urandom(1200 * 1200 * 3))
+    content = encoded(noise, 'PNG')
+
+    default_read, _ = validate(forms.ImageField(), content)
+    limited_read, limited_peak = validate(LimitedImageField(), content)
+    assert default_read == len(content)
+    assert limited_read < 64 * 1024, (
+        "Убедитесь, что при проверке изображения читается только"
+        " его заголовок."
+    )
+    assert limited_peak < 256 * 1024, (
+        "Убедитесь, что проверка изображения не расходует память"
+        " на его содержимое."
+    )
+
+
+@pytest.mark.django_db
+def test_post_form_rejects_bomb(user_client, published_category):
+    user_client.post('/posts/create/', {
+        'title': 'Заголовок', 'text': 'Текст',
+        'pub_date': timezone.now().strftime('%Y-%m-%dT%H:%M'),
+        'category': published_category.pk,
+        'image': upload(crafted_png(60000, 60000)),
+    })
+    assert not Post.objects.exists(), (
+        "Убедитесь, что пост с изображением-бомбой не создаётся."
+    )
@@ -0,0 +1,56 @@
+import pytest
+from django.core.files.storage import default_storage
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_image_variants_are_rendered(client, post_with_published_location):
+    post = post_with_published_location
+    post.refresh_from_db()
+    assert set(post.image_variants) == {'card', 'detail'}, (
+        "Убедитесь, что после сохранения поста с изображением для него"
+        " готовятся уменьшенные копии."
+    )
+    for copies in post.image_variants.values():
+        assert default_storage.exists(copies['WEBP']), (
+            "Убедитесь, что копии изображения сохраняются в формате WebP."
+        )
+
+    content = client.get(f'/posts/{post.pk}/').content.decode('utf-8')
+    assert 'type="image/webp"' in content, (
+        "Убедитесь, что на странице поста отдаётся WebP-копия изображения."
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_image_variants_follow_image(post_with_published_location):
+    post = post_with_published_location
+    post.refresh_from_db()
+    old_copies = post.image_variants['card']
+    post.image = None
+    post.save()
+    post.refresh_from_db()
+    assert post.image_variants == {}, (
+        "Убедитесь, что копии удалённого изображения забываются."
+    )
+    assert not default_storage.exists(old_copies['JPEG']), (
+        "Убедитесь, что файлы копий удаляются вместе с изображением."
+    )
+
+
+def test_image_dimensions_are_stored(client, post_with_published_location):
+    post = post_with_published_location
+    post.refresh_from_db()
+    assert (post.image_width, post.image_height) == (
+        post.image.width, post.image.height), (
+        "Убедитесь, что размеры изображения сохраняются в базе данных."
+    )
+
+    content = client.get('/').content.decode('utf-8')
+    card = post.image_variants['card']
+    for attribute in (f'width="{card["width"]}"', 'srcset=', 'sizes=',
+                      'loading="lazy"'):
+        assert attribute in content, (
+            "Убедитесь, что изображение в карточке поста выводится с"
+            f" атрибутом {attribute}."
+        )
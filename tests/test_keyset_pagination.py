@@ -0,0 +1,53 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _walk(client, url, direction):
+    pages, query = [], ''
+    while True:
+        page_obj = client.get(url + query).context['page_obj']
+        pages.append([post.id for post in page_obj])
+        cursor = getattr(page_obj, f'{direction}_cursor')
+        if cursor is None:
+            return pages
+        query = f'?{"after" if direction == "next" else "before"}={cursor}'
+
+
+def test_keyset_pages_cover_all_posts(
+        user_client, many_posts_with_published_locations):
+    posts = many_posts_with_published_locations
+    pages = _walk(user_client, '/', 'next')
+    ids = [post_id for page in pages for post_id in page]
+    assert sorted(ids) == sorted(post.id for post in posts), (
+        "Убедитесь, что переход по ссылкам `?after=` показывает каждую"
+        " публикацию ровно один раз."
+    )
+    assert all(len(page) <= N_PER_PAGE for page in pages)
+
+    last_page = '/?after=' + user_client.get('/').context[
+        'page_obj'].next_cursor
+    back = user_client.get(last_page).context['page_obj']
+    first = user_client.get(
+        f'/?before={back.previous_cursor}').context['page_obj']
+    assert [post.id for post in first] == pages[0], (
+        "Убедитесь, что ссылка `?before=` возвращает на предыдущую страницу."
+    )
+
+
+def test_keyset_page_has_no_count_query(
+        user_client, many_posts_with_published_locations):
+    cursor = user_client.get('/').context['page_obj'].next_cursor
+    with CaptureQueriesContext(connection) as ctx:
+        user_client.get(f'/?after={cursor}')
+    assert not any('COUNT(' in q['sql'] for q in ctx.captured_queries), (
+        "Убедитесь, что постраничный вывод не выполняет запрос COUNT."
+    )
+
+
+def test_keyset_invalid_cursor(user_client):
+    assert user_client.get('/?after=broken').status_code == 404
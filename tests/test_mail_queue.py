@@ -0,0 +1,112 @@
+from unittest import mock
+
+import pytest
+from django.core import mail
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.management import call_command
+from django.test import override_settings
+
+from blog.mail import pending_emails
+from blog.models import QueuedEmail
+
+QUEUED = 'blog.mail.QueuedEmailBackend'
+FILE_BASED = 'django.core.mail.backends.filebased.EmailBackend'
+SMTP = 'django.core.mail.backends.smtp.EmailBackend'
+
+
+class FailingBackend(BaseEmailBackend):
+    def send_messages(self, email_messages):
+        raise ConnectionRefusedError('сервер недоступен')
+
+
+@pytest.mark.django_db
+def test_password_reset_is_queued(client, user, tmp_path):
+    user.email = 'user@example.com'
+    user.save()
+    with override_settings(EMAIL_BACKEND=QUEUED,
+                           EMAIL_DELIVERY_BACKEND=FILE_BASED,
+                           EMAIL_FILE_PATH=tmp_path):
+        client.post('/auth/password_reset/', {'email': user.email})
+        assert QueuedEmail.objects.count() == 1, (
+            "Убедитесь, что письмо для сброса пароля ставится в очередь."
+        )
+        assert not list(tmp_path.iterdir()), (
+            "Убедитесь, что письма не отправляются во время запроса."
+        )
+        mail.send_mail('Тема', 'Текст', 'from@example.com',
+                       ['first@example.com', 'second@example.com'])
+        call_command('send_queued_mail')
+    assert not QueuedEmail.objects.exists(), (
+        "Убедитесь, что отправленные письма удаляются из очереди."
+    )
+    spool = list(tmp_path.iterdir())
+    assert len(spool) == 1, (
+        "Убедитесь, что письма из очереди отправляются через одно"
+        " соединение."
+    )
+    content = spool[0].read_text(encoding='utf-8')
+    assert 'To: user@example.com' in content
+    assert 'Текст' in content and 'second@example.com' in content
+
+
+@pytest.mark.django_db
+def test_failed_delivery_is_retried():
+    with override_settings(EMAIL_BACKEND=QUEUED,
+                           EMAIL_DELIVERY_BACKEND=(
+                               f'{__name__}.FailingBackend')):
+        mail.send_mail('Тема', 'Текст', 'from@example.com',
+                       ['user@example.com'])
+        call_command('send_queued_mail')
+        queued = QueuedEmail.objects.get()
+        assert queued.attempts == 1 and 'ConnectionRefusedError' in (
+            queued.last_error), (
+            "Убедитесь, что неудачная отправка оставляет письмо в очереди"
+            " и запоминает ошибку."
+        )
+        with override_settings(EMAIL_DELIVERY_BACKEND='django.core.mail.'
+                               'backends.locmem.EmailBackend'):
+            call_command('send_queued_mail')
+    assert not QueuedEmail.objects.exists()
+    assert mail.outbox[0].recipients() == ['user@example.com']
+
+
+@pytest.mark.django_db
+def test_delivery_over_smtp():
+    with override_settings(EMAIL_BACKEND=QUEUED, EMAIL_DELIVERY_BACKEND=SMTP):
+        mail.send_mail('Тема', 'Текст письма', 'from@example.com',
+                       ['user@example.com'])
+        with mock.patch('smtplib.SMTP') as smtp:
+            call_command('send_queued_mail')
+    assert not QueuedEmail.objects.exists(), (
+        "Убедитесь, что письма из очереди отправляются через SMTP."
+    )
+    from_email, recipients, message = smtp.return_value.sendmail.call_args[0]
+    assert recipients == ['user@example.com']
+    assert b'\r\nSubject: =?utf-8?b?' in message, (
+        "Убедитесь, что письмо передаётся SMTP-серверу с переводами строк"
+        " CRLF."
+    )
+
+
+class SendingChecksBackend(BaseEmailBackend):
+    def send_messages(self, email_messages):
+        from django.db import connection
+        assert not connection.in_atomic_block, (
+            "Убедитесь, что письма отправляются вне транзакции."
+        )
+        assert not pending_emails().exists(), (
+            "Убедитесь, что отправляемые письма заняты воркером и не"
+            " достанутся другому."
+        )
+        return len(email_messages)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_batch_is_claimed_before_sending():
+    with override_settings(EMAIL_BACKEND=QUEUED,
+                           EMAIL_DELIVERY_BACKEND=(
+                               f'{__name__}.SendingChecksBackend')):
+        mail.send_mail('Тема', 'Текст', 'from@example.com',
+                       ['user@example.com'])
+        call_command('send_queued_mail')
+    assert not QueuedEmail.objects.exists()
@@ -0,0 +1,64 @@
+import pytest
+from django.test import override_settings
+
+pytestmark = [pytest.mark.django_db]
+
+
+def get_content(response) -> bytes:
+    return b''.join(response.streaming_content)
+
+
+def test_hashed_image_is_immutable(client, post_with_published_location):
+    post = post_with_published_location
+    response = client.get(post.image.url)
+    assert response.status_code == 200
+    assert get_content(response) == post.image.read(), (
+        "Убедитесь, что изображение поста отдаётся целиком."
+    )
+    assert 'immutable' in response['Cache-Control'], (
+        "Убедитесь, что файлы с хэшем в имени кэшируются навсегда."
+    )
+
+    post.refresh_from_db()
+    card = post.image_variants['card']['JPEG']
+    assert client.get(f'/media/{card}').status_code == 200, (
+        "Убедитесь, что уменьшенные копии изображения доступны."
+    )
+
+
+def test_range_request(client, post_with_published_location):
+    post = post_with_published_location
+    response = client.get(post.image.url, HTTP_RANGE='bytes=10-19')
+    assert response.status_code == 206, (
+        "Убедитесь, что запрос части файла возвращает статус 206."
+    )
+    assert get_content(response) == post.image.read()[10:20]
+    assert response['Content-Range'].startswith('bytes 10-19/')
+
+    response = client.get(post.image.url, HTTP_RANGE='bytes=100000-')
+    assert response.status_code == 416
+
+
+@override_settings(MEDIA_ACCEL_HEADER='X-Accel-Redirect')
+def test_accel_redirect(client, post_with_published_location):
+    post = post_with_published_location
+    response = client.get(post.image.url)
+    assert response['X-Accel-Redirect'].endswith(post.image.name), (
+        "Убедитесь, что отдача файла передаётся веб-серверу через"
+        " заголовок X-Accel-Redirect."
+    )
+    assert not response.content
+
+
+def test_hidden_post_image(client, user_client, post_with_published_location):
+    post = post_with_published_location
+    post.is_published = False
+    post.save()
+    assert client.get(post.image.url).status_code == 404, (
+        "Убедитесь, что изображение скрытого поста недоступно анониму."
+    )
+    response = user_client.get(post.image.url)
+    assert response.status_code == 200, (
+        "Убедитесь, что автор видит изображение своего скрытого поста."
+    )
+    assert 'private' in response['Cache-Control']
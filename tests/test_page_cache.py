@@ -0,0 +1,127 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog.cache import FEED_GENERATION, get_generations
+from blog.models import Post
+from conftest import get_in_thread
+
+pytestmark = [pytest.mark.django_db(transaction=True)]
+
+
+def _queries(client, url):
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(url)
+    assert response.status_code == 200
+    return len(ctx.captured_queries), response.content.decode('utf-8')
+
+
+def test_anonymous_pages_are_cached(
+        unlogged_client, post_with_published_location):
+    post = post_with_published_location
+    for url in ('/', f'/category/{post.category.slug}/',
+                f'/profile/{post.author.username}/'):
+        _queries(unlogged_client, url)
+        n_queries, content = _queries(unlogged_client, url)
+        assert n_queries == 0, (
+            f"Убедитесь, что страница `{url}` для анонимного посетителя"
+            " отдаётся из кэша без запросов к базе данных."
+        )
+        assert post.title in content
+
+
+def test_post_change_invalidates_pages(
+        unlogged_client, post_with_published_location):
+    post = post_with_published_location
+    category_url = f'/category/{post.category.slug}/'
+    _queries(unlogged_client, '/')
+    _queries(unlogged_client, category_url)
+    post.title = 'Изменённый заголовок'
+    post.save()
+    for url in ('/', category_url):
+        _, content = _queries(unlogged_client, url)
+        assert 'Изменённый заголовок' in content, (
+            "Убедитесь, что изменение публикации сбрасывает кэш страниц,"
+            " на которых она показана."
+        )
+
+
+def test_page_read_before_commit_is_not_kept(
+        unlogged_client, post_with_published_location):
+    post = post_with_published_location
+    title = post.title
+    _queries(unlogged_client, '/')
+    with transaction.atomic():
+        post.title = 'Изменённый заголовок'
+        post.save()
+        in_flight = get_in_thread(unlogged_client, '/')
+    assert in_flight.status_code == 200 and title in in_flight.content.decode(
+        'utf-8'), (
+        "Убедитесь, что до фиксации транзакции другие запросы получают"
+        " страницу с сохранённым состоянием."
+    )
+    _, content = _queries(unlogged_client, '/')
+    assert 'Изменённый заголовок' in content, (
+        "Убедитесь, что кэш страниц сбрасывается после фиксации"
+        " транзакции: страница, собранная до неё, устаревает."
+    )
+
+
+def test_generations_are_shared(unlogged_client, post_with_published_location):
+    unlogged_client.get('/')
+    generations = get_generations([FEED_GENERATION])
+    # the cache of another worker process does not hold them
+    caches['default'].clear()
+    assert get_generations([FEED_GENERATION]) == generations, (
+        "Убедитесь, что счётчики поколений страниц хранятся в кэше,"
+        " общем для всех процессов."
+    )
+
+
+def test_post_save_does_not_load_author(post_with_published_location):
+    post = Post.objects.get(pk=post_with_published_location.pk)
+    with CaptureQueriesContext(connection) as ctx:
+        post.title = 'Изменённый заголовок'
+        post.save()
+    assert not [query for query in ctx.captured_queries
+                if 'FROM "auth_user"' in query['sql']], (
+        "Убедитесь, что сброс кэша страниц при сохранении публикации не"
+        " загружает автора отдельным запросом."
+    )
+
+
+def test_comment_invalidates_pages(
+        mixer, unlogged_client, post_with_published_location):
+    post = post_with_published_location
+    _queries(unlogged_client, '/')
+    mixer.blend('blog.Comment', post=post)
+    n_queries, _ = _queries(unlogged_client, '/')
+    assert n_queries > 0
+
+
+def test_scheduled_post_appears_after_publish_command(
+        mixer, unlogged_client, user, published_category):
+    post = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        is_published=True, pub_date=timezone.now() + timedelta(days=1))
+    assert post.title not in _queries(unlogged_client, '/')[1]
+
+    # the publication date has come
+    Post.objects.filter(pk=post.pk).update(
+        pub_date=timezone.now() - timedelta(seconds=1))
+    call_command('publish_scheduled', stdout=StringIO())
+
+    post.refresh_from_db()
+    assert post.is_visible, (
+        "Убедитесь, что команда `publish_scheduled` делает видимыми"
+        " публикации, дата которых наступила."
+    )
+    assert post.title in _queries(unlogged_client, '/')[1], (
+        "Убедитесь, что команда `publish_scheduled` сбрасывает кэш страниц."
+    )
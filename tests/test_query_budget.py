@@ -0,0 +1,227 @@
+from io import BytesIO
+from itertools import count
+
+import pytest
+from PIL import Image
+from django.core.cache import caches
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+from django.urls import URLPattern, reverse
+from django.utils import timezone
+
+import blog.urls
+import blogicum.urls
+import pages.urls
+from blog.uploads import start_upload
+from core.budget import QueryBudgetExceeded, get_budget, query_budget
+
+
+SHADES = count()
+
+
+def png(name: str) -> SimpleUploadedFile:
+    """A new image every time: identical ones share the stored file and
+    its copies, which are not deleted along with the post then
+    """
+    shade = next(SHADES)
+    image = BytesIO()
+    Image.new('RGB', (64, 64), color=(shade % 256, shade // 256, 30)).save(
+        image, 'PNG')
+    return SimpleUploadedFile(name, image.getvalue())
+
+
+@pytest.fixture
+def make_dataset(mixer, user, another_user, published_category,
+                 published_location):
+    """Objects for the parameters of every route; requests may change
+    them, so each gets a new set
+    """
+    def make_dataset() -> dict:
+        post = mixer.blend(
+            'blog.Post', author=user, category=published_category,
+            location=published_location, is_published=True,
+            image=png('post.png'))
+        posts = [post] + mixer.cycle(5).blend(
+            'blog.Post', author=user, category=post.category,
+            location=post.location, is_published=True)
+        hidden = mixer.blend('blog.Post', author=user, is_published=False,
+                             image=png('hidden.png'))
+        for item in posts:
+            mixer.cycle(3).blend('blog.Comment', post=item,
+                                 author=another_user)
+        comment = mixer.blend('blog.Comment', post=post, author=user)
+        upload = start_upload(user, 'image.jpg', 1, '0' * 64)
+        return {'post_pk': post.pk, 'comment_pk': comment.pk,
+                'category_slug': post.category.slug,
+                'category': post.category.pk, 'location': post.location.pk,
+                'username': user.username, 'token': upload.token,
+                'path': hidden.image.name}
+    return make_dataset
+
+
+def post_form(dataset: dict) -> dict:
+    """The post with a new image, its variants are rendered in place"""
+    return {'title': 'Заголовок', 'text': 'Текст',
+            'pub_date': timezone.now().strftime('%Y-%m-%dT%H:%M'),
+            'category': dataset['category'],
+            'location': dataset['location'],
+            'image': png('cover.png')}
+
+
+# routes serving POST only
+POST_ONLY = {'blog:add_comment', 'blog:start_upload'}
+# data sent to the routes, the forms are valid so that the whole write
+# path is counted
+SUBMITTED = {
+    'blog:create_post': post_form,
+    'blog:edit_post': post_form,
+    'blog:delete_post': lambda dataset: {},
+    'blog:add_comment': lambda dataset: {'text': 'Комментарий'},
+    'blog:edit_comment': lambda dataset: {'text': 'Комментарий'},
+    'blog:delete_comment': lambda dataset: {},
+    'blog:edit_profile': lambda dataset: {
+        'username': dataset['username'], 'email': 'user@example.com',
+        'first_name': 'Имя', 'last_name': 'Фамилия'},
+    'blog:start_upload': lambda dataset: {
+        'filename': 'image.jpg', 'size': 1, 'checksum': '0' * 64},
+}
+
+# The most queries a request to the route has run here, by the author
+# with cold caches and images rendered in place, and where they come
+# from. Requests of logged in users start with the session and the
+# user (2); SQLite counts BEGIN of a write transaction, not COMMIT.
+# Storing an image file takes 7 queries (its record is looked up and
+# written within savepoints), deleting one 4; once the transaction is
+# over the file is checked and its 4 copies (2 sizes in 2 formats, see
+# IMAGE_VARIANTS) are deleted, 3 queries each.
+MEASURED = {
+    'blog:index': 3,  # 2 + posts of the page
+    'blog:post_detail': 4,  # 2 + the post + the first comments
+    'blog:post_comments': 4,  # 2 + the post + the comments
+    'blog:category_posts': 4,  # 2 + the category + posts of the page
+    'blog:profile': 4,  # 2 + the author + posts of the page
+    # POST with a new image: 2 + BEGIN + the post + location and
+    # category checked by the form and the model (4) + the listing pages
+    # and the old image before saving (2) + the new image stored (7) +
+    # the post updated + the old image deleted (4) + the post updated
+    # again + copies looked up and stored (2) + the listing pages + the
+    # old image checked and its copies deleted (13)
+    'blog:edit_post': 39,
+    # POST: 2 + BEGIN + the post with author and category + its comments
+    # found and deleted (2) + the post deleted + the image deleted (4) +
+    # the image checked and its copies deleted (13)
+    'blog:delete_post': 24,
+    # POST with an image: 2 + BEGIN + location and category checked by
+    # the form and the model (4) + the old image (none) + the image
+    # stored (7) + the post inserted + copies looked up and stored (2) +
+    # the listing pages
+    'blog:create_post': 19,
+    'blog:start_upload': 3,  # 2 + the upload inserted
+    # PUT of the last chunk: 2 + the upload + the received size updated
+    # + the finished upload dropped
+    'blog:upload_chunk': 5,
+    # 2 + BEGIN + the post + the comment inserted + the counter of the
+    # post + the pages of the post
+    'blog:add_comment': 7,
+    # 2 + BEGIN + the comment + its post before saving + the comment
+    # updated + the pages of the post
+    'blog:edit_comment': 7,
+    # 2 + BEGIN + the comment + the comment deleted + the counter of the
+    # post + the pages of the post
+    'blog:delete_comment': 7,
+    # POST: 2 + BEGIN + the username checked + the user updated
+    'blog:edit_profile': 5,
+    'pages:about': 2,  # 2
+    'pages:rules': 2,  # 2
+    # an image of a hidden post to its author: 2 + public posts with the
+    # image + posts of the author with it
+    'media': 4,
+}
+# Budgets allow this many queries more: a request whose session has
+# ended, e.g. by a password change, deletes it (2)
+BUDGET_MARGIN = 2
+
+
+def routes():
+    """Named routes of the blog and the pages apps and the media route
+    with their views and parameters
+    """
+    for namespace, patterns in (('blog', blog.urls.urlpatterns),
+                                ('pages', pages.urls.urlpatterns)):
+        for pattern in patterns:
+            if isinstance(pattern, URLPattern):
+                yield (f'{namespace}:{pattern.name}', pattern.callback,
+                       list(pattern.pattern.converters))
+    for pattern in blogicum.urls.urlpatterns:
+        if getattr(pattern, 'name', None) == 'media':
+            yield ('media', pattern.callback,
+                   list(pattern.pattern.regex.groupindex))
+
+
+def requests(name: str, dataset: dict):
+    """Methods and data of the requests made to the route"""
+    if name not in POST_ONLY:
+        yield 'get', {}
+    if name in SUBMITTED:
+        yield 'post', SUBMITTED[name](dataset)
+    if name == 'blog:upload_chunk':
+        yield 'put', {'data': b'0', 'content_type': 'application/octet-stream',
+                      'HTTP_UPLOAD_OFFSET': '0'}
+
+
+def count_queries(client, method: str, url: str, data: dict) -> int:
+    """Queries of a request made with cold caches, the worst case"""
+    for cache in caches.all():
+        cache.clear()
+    if method == 'post':
+        response = client.post(url, data)
+    else:
+        response = getattr(client, method)(url, **data)
+    return response.wsgi_request.query_count.count
+
+
+@pytest.mark.django_db(transaction=True)
+def test_routes_keep_query_budgets(make_dataset, user_client, client):
+    over = []
+    for name, view, parameters in routes():
+        assert get_budget(view) == MEASURED[name] + BUDGET_MARGIN, (
+            f"Убедитесь, что бюджет запросов представления `{name}` равен"
+            " измеренному числу запросов с небольшим запасом."
+        )
+        methods = [method for method, data in requests(name, make_dataset())]
+        for visitor in (user_client, client):
+            for method in methods:
+                dataset = make_dataset()
+                url = reverse(name, kwargs={
+                    key: dataset[key] for key in parameters})
+                data = dict(requests(name, dataset))[method]
+                count = count_queries(visitor, method, url, data)
+                if count > MEASURED[name]:
+                    over.append(f'{method.upper()} {url}: {count} >'
+                                f' {MEASURED[name]}')
+    assert not over, (
+        "Убедитесь, что страницы не выполняют больше запросов, чем было"
+        " измерено: " + ', '.join(over)
+    )
+
+
+@pytest.mark.django_db
+def test_middleware_enforces_budget(client, monkeypatch, caplog):
+    from blog.views import PostListView
+    monkeypatch.setattr(PostListView, 'query_budget', 0)
+    with override_settings(QUERY_BUDGET_RAISE=True):
+        with pytest.raises(QueryBudgetExceeded):
+            client.get('/')
+    caches['default'].clear()
+    with override_settings(QUERY_BUDGET_RAISE=False):
+        assert client.get('/').status_code == 200
+    assert 'при бюджете 0' in caplog.text, (
+        "Убедитесь, что превышение бюджета запросов попадает в журнал."
+    )
+
+
+def test_query_budget_decorator():
+    @query_budget(2)
+    def view(request):
+        pass
+    assert get_budget(view) == 2
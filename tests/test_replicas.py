@@ -0,0 +1,74 @@
+import sqlite3
+from contextlib import closing
+
+import pytest
+from django.test import override_settings
+
+from blog.models import Post
+from core.replicas import (PRIMARY_COOKIE, ReplicaRouter, copy_sqlite,
+                           replica_reads)
+
+
+@override_settings(DATABASE_REPLICAS=['replica1', 'replica2'])
+def test_router():
+    router = ReplicaRouter()
+    assert router.db_for_read(Post) is None
+    with replica_reads():
+        replica = router.db_for_read(Post)
+        assert replica in ('replica1', 'replica2'), (
+            "Убедитесь, что чтение публичных страниц идёт из реплики."
+        )
+        assert {router.db_for_read(Post) for _ in range(20)} == {replica}, (
+            "Убедитесь, что все запросы страницы читают из одной реплики."
+        )
+        assert router.db_for_write(Post) == 'default', (
+            "Убедитесь, что запись всегда идёт в основную базу."
+        )
+    assert not router.allow_migrate('replica1', 'blog')
+    assert router.allow_migrate('default', 'blog')
+
+
+@pytest.fixture
+def routed_reads(monkeypatch):
+    reads = []
+    db_for_read = ReplicaRouter.db_for_read
+
+    def spy(self, model, **hints):
+        reads.append(db_for_read(self, model, **hints))
+        return reads[-1]
+    monkeypatch.setattr(ReplicaRouter, 'db_for_read', spy)
+    # queries sent to the "replica" still reach the test database
+    with override_settings(DATABASE_REPLICAS=['default']):
+        yield reads
+
+
+@pytest.mark.django_db
+def test_reads_follow_writes(user_client, post_with_published_location,
+                             routed_reads):
+    url = f'/posts/{post_with_published_location.pk}/'
+    user_client.get(url)
+    assert routed_reads and set(routed_reads) == {'default'}, (
+        "Убедитесь, что страница публикации читается из реплики."
+    )
+    response = user_client.post(f'{url}comment/', {'text': 'Комментарий'})
+    assert PRIMARY_COOKIE in response.cookies, (
+        "Убедитесь, что после записи клиент читает из основной базы."
+    )
+    routed_reads.clear()
+    user_client.get(url)
+    assert routed_reads and set(routed_reads) == {None}, (
+        "Убедитесь, что автор видит свои изменения без задержки"
+        " репликации."
+    )
+
+
+def test_copy_sqlite(tmp_path):
+    primary, replica = tmp_path / 'primary.db', tmp_path / 'replica.db'
+    with closing(sqlite3.connect(primary)) as connection:
+        connection.execute('CREATE TABLE post (title TEXT)')
+        connection.execute("INSERT INTO post VALUES ('Заголовок')")
+        connection.commit()
+    copy_sqlite(primary, replica)
+    with closing(sqlite3.connect(replica)) as connection:
+        assert connection.execute('SELECT title FROM post').fetchall() == [
+            ('Заголовок',)]
@@ -0,0 +1,59 @@
+from datetime import timedelta
+
+import pytest
+from django.contrib.sessions.models import Session
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+CACHED_SESSIONS = 'django.contrib.sessions.backends.cached_db'
+
+
+def test_sessions_cached_only_in_shared_cache(settings):
+    assert settings.SESSION_CACHE_ALIAS == 'shared', (
+        "Убедитесь, что сессии кэшируются только в общем для всех"
+        " процессов кэше."
+    )
+    if not settings.CACHE_LOCATION:
+        assert settings.SESSION_ENGINE != CACHED_SESSIONS, (
+            "Убедитесь, что без общего кэша сессии читаются из базы"
+            " данных."
+        )
+
+
+@pytest.mark.django_db
+@override_settings(SESSION_ENGINE=CACHED_SESSIONS)
+def test_pages_skip_session_table(user):
+    client = Client()
+    client.force_login(user)
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(f'/profile/{user.username}/')
+    assert response.status_code == 200
+    assert not [query for query in queries
+                if 'django_session' in query['sql']], (
+        "Убедитесь, что сессия авторизованного пользователя читается из"
+        " кэша, а не из базы данных."
+    )
+
+
+@pytest.mark.django_db
+def test_purge_expired_sessions(capsys):
+    now = timezone.now()
+    Session.objects.bulk_create(
+        [Session(session_key=f'expired{number}', session_data='',
+                 expire_date=now - timedelta(days=1)) for number in range(5)]
+        + [Session(session_key='alive', session_data='',
+                   expire_date=now + timedelta(days=1))])
+    with CaptureQueriesContext(connection) as queries:
+        call_command('purge_expired_sessions', batch_size=2)
+    assert list(Session.objects.values_list('pk', flat=True)) == ['alive'], (
+        "Убедитесь, что удаляются только истёкшие сессии."
+    )
+    deletes = [query for query in queries
+               if query['sql'].startswith('DELETE')]
+    assert len(deletes) == 3, (
+        "Убедитесь, что истёкшие сессии удаляются частями."
+    )
+    assert 'Удалено сессий: 5' in capsys.readouterr().out
@@ -0,0 +1,100 @@
+import pytest
+from django.core.management import call_command
+from django.db import OperationalError, connection, transaction
+
+from blog.models import Comment
+from core import db
+from core.constants import DB_LOCK_RETRIES, SQLITE_PRAGMAS
+
+
+@pytest.mark.django_db
+def test_pragmas_are_set():
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA synchronous')
+        assert cursor.fetchone()[0] == 1, (
+            "Убедитесь, что соединения SQLite используют"
+            " `synchronous=NORMAL`."
+        )
+        cursor.execute('PRAGMA busy_timeout')
+        assert cursor.fetchone()[0] == SQLITE_PRAGMAS['busy_timeout']
+
+
+@pytest.fixture
+def pauses(monkeypatch):
+    pauses = []
+    monkeypatch.setattr(db.time, 'sleep', pauses.append)
+    return pauses
+
+
+def flaky(failures, message='database is locked'):
+    calls = []
+
+    def func():
+        calls.append(1)
+        if len(calls) <= failures:
+            raise OperationalError(message)
+        return len(calls)
+    return func
+
+
+@pytest.mark.django_db(transaction=True)
+def test_retry_on_lock(pauses):
+    assert db.retry_on_lock(flaky(2))() == 3, (
+        "Убедитесь, что транзакция повторяется, пока база заблокирована."
+    )
+    assert len(pauses) == 2 and all(
+        0 <= pause <= db.DB_LOCK_BACKOFF_MAX for pause in pauses)
+    with pytest.raises(OperationalError):
+        db.retry_on_lock(flaky(DB_LOCK_RETRIES + 1))()
+    with pytest.raises(OperationalError):
+        db.retry_on_lock(flaky(1, 'no such table: blog_post'))()
+    with transaction.atomic(), pytest.raises(OperationalError):
+        db.retry_on_lock(flaky(1))()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_bench_sqlite(post_with_published_location, capsys):
+    post = post_with_published_location
+    call_command('bench_sqlite', seconds=0.2, readers=1, writers=1)
+    assert 'запись (1)' in capsys.readouterr().out
+    post.refresh_from_db()
+    assert not Comment.objects.exists() and post.comment_count == 0, (
+        "Убедитесь, что комментарии бенчмарка удаляются."
+    )
+
+
+class StubConnection:
+    """Persistent connection whose server went away meanwhile"""
+
+    in_atomic_block = False
+
+    def __init__(self):
+        self.connection, self.pings, self.closed = object(), 0, 0
+
+    def is_usable(self):
+        self.pings += 1
+        return False
+
+    def close(self):
+        self.closed += 1
+        self.connection = None
+
+    def _cursor(self, name=None):
+        return 'cursor'
+
+
+def test_health_check_on_first_use(monkeypatch):
+    used, idle = StubConnection(), StubConnection()
+    monkeypatch.setattr(db.connections, 'all', lambda: [used, idle])
+    for stub in (used, idle):
+        db.install_health_check(stub)
+    db.expire_health_checks()
+    assert used._cursor() == 'cursor' and used._cursor() == 'cursor'
+    assert (used.pings, used.closed) == (1, 1), (
+        "Убедитесь, что соединение проверяется один раз за запрос перед"
+        " первым использованием и закрывается, если не работает."
+    )
+    assert idle.pings == 0, (
+        "Убедитесь, что соединения, которые запрос не использует, не"
+        " проверяются."
+    )
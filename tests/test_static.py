@@ -0,0 +1,44 @@
+import gzip
+
+import pytest
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.templatetags.static import static
+from django.test import override_settings
+
+
+@pytest.fixture
+def collected_static(tmp_path):
+    with override_settings(STATIC_ROOT=tmp_path):
+        call_command('collectstatic', interactive=False, verbosity=0)
+        yield tmp_path
+
+
+@pytest.mark.django_db
+def test_hashed_and_compressed(client, collected_static):
+    url = static('css/bootstrap.min.css')
+    assert url != '/static/css/bootstrap.min.css', (
+        "Убедитесь, что статические файлы получают имена с хэшем"
+        " содержимого."
+    )
+    name = url[len('/static/'):]
+    assert (collected_static / f'{name}.gz').exists(), (
+        "Убедитесь, что при collectstatic создаются сжатые .gz копии."
+    )
+
+    response = client.get(url, HTTP_ACCEPT_ENCODING='gzip, deflate')
+    assert response['Content-Encoding'] == 'gzip', (
+        "Убедитесь, что клиенту, принимающему gzip, отдаётся сжатая копия."
+    )
+    content = gzip.decompress(b''.join(response.streaming_content))
+    with staticfiles_storage.open(name) as file:
+        assert content == file.read()
+    assert 'immutable' in response['Cache-Control'], (
+        "Убедитесь, что файлы с хэшем в имени кэшируются навсегда."
+    )
+    assert 'Accept-Encoding' in response['Vary']
+
+    response = client.get(url, HTTP_ACCEPT_ENCODING='gzip;q=0')
+    assert not response.has_header('Content-Encoding'), (
+        "Убедитесь, что клиенту без поддержки сжатия отдаётся исходный файл."
+    )
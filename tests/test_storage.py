@@ -0,0 +1,39 @@
+from io import BytesIO
+
+import pytest
+from PIL import Image
+from django.core.files.images import ImageFile
+from django.core.files.storage import default_storage
+
+pytestmark = [pytest.mark.django_db(transaction=True)]
+
+
+def make_image(name: str) -> ImageFile:
+    image_io = BytesIO()
+    Image.new('RGB', (50, 50), color=(10, 20, 30)).save(image_io, 'JPEG')
+    return ImageFile(image_io, name=name)
+
+
+def test_identical_uploads_share_file(mixer, user):
+    first, second = (
+        mixer.blend('blog.Post', author=user, image=make_image(name))
+        for name in ('first.jpg', 'second.jpg')
+    )
+    name = first.image.name
+    assert name == second.image.name, (
+        "Убедитесь, что одинаковые изображения сохраняются в один файл."
+    )
+    parts = name.split('/')
+    assert parts[-3] + parts[-2] == parts[-1][:4], (
+        "Убедитесь, что файлы раскладываются по вложенным директориям"
+        " по первым символам хэша содержимого."
+    )
+
+    first.delete()
+    assert default_storage.exists(name), (
+        "Убедитесь, что удаление одного поста не удаляет общий файл."
+    )
+    second.delete()
+    assert not default_storage.exists(name), (
+        "Убедитесь, что файл удаляется вместе с последней ссылкой на него."
+    )
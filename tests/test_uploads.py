@@ -0,0 +1,151 @@
+import hashlib
+from io import BytesIO
+from pathlib import Path
+
+import pytest
+from PIL import Image
+from django.db import OperationalError, connection
+from django.db.models.signals import post_save
+from django.utils import timezone
+
+from blog.models import ChunkedUpload, Post
+from blog.uploads import OffsetMismatch, append_chunk
+from core import db
+
+pytestmark = [pytest.mark.django_db]
+
+
+def image_bytes() -> bytes:
+    image_io = BytesIO()
+    Image.new('RGB', (64, 64), color=(200, 30, 30)).save(image_io, 'PNG')
+    return image_io.getvalue()
+
+
+def start(client, content: bytes, checksum: str = None) -> dict:
+    response = client.post('/uploads/', {
+        'filename': 'cover.png', 'size': len(content),
+        'checksum': checksum or hashlib.sha256(content).hexdigest(),
+    })
+    assert response.status_code == 201, (
+        "Убедитесь, что загрузка по частям начинается POST-запросом"
+        " на /uploads/."
+    )
+    return response.json()
+
+
+def put_chunk(client, token: str, offset: int, chunk: bytes):
+    return client.put(f'/uploads/{token}/', chunk,
+                      content_type='application/octet-stream',
+                      HTTP_UPLOAD_OFFSET=str(offset))
+
+
+def test_chunked_upload_attached_to_post(user_client, published_category):
+    content = image_bytes()
+    token = start(user_client, content)['token']
+    middle = len(content) // 2
+
+    assert put_chunk(user_client, token, 0, content[:middle]).json()[
+        'offset'] == middle
+    response = put_chunk(user_client, token, 0, content[:middle])
+    assert response.status_code == 409, (
+        "Убедитесь, что фрагмент с неверным смещением отклоняется."
+    )
+    assert user_client.get(f'/uploads/{token}/').json()['offset'] == middle, (
+        "Убедитесь, что загрузку можно продолжить с сохранённого смещения."
+    )
+    assert put_chunk(user_client, token, middle, content[middle:]).json()[
+        'complete']
+
+    user_client.post('/posts/create/', {
+        'title': 'Заголовок', 'text': 'Текст', 'upload': token,
+        'pub_date': timezone.now().strftime('%Y-%m-%dT%H:%M'),
+        'category': published_category.pk,
+    })
+    post = Post.objects.get()
+    assert post.image.read() == content, (
+        "Убедитесь, что завершённая загрузка прикрепляется к посту"
+        " по токену."
+    )
+    assert not ChunkedUpload.objects.exists(), (
+        "Убедитесь, что использованная загрузка удаляется."
+    )
+
+
+def test_checksum_mismatch(user_client):
+    content = image_bytes()
+    token = start(user_client, content, checksum='0' * 64)['token']
+    response = put_chunk(user_client, token, 0, content)
+    assert response.status_code == 400, (
+        "Убедитесь, что файл с неверной контрольной суммой отклоняется."
+    )
+    assert not ChunkedUpload.objects.exists()
+
+
+def test_upload_of_another_user(user_client, another_user_client):
+    token = start(user_client, image_bytes())['token']
+    assert another_user_client.get(f'/uploads/{token}/').status_code == 404, (
+        "Убедитесь, что продолжить загрузку может только её автор."
+    )
+
+
+class SlowClient(BytesIO):
+    def read(self, size=-1):
+        assert not connection.in_atomic_block, (
+            "Убедитесь, что фрагмент загрузки читается вне транзакции."
+        )
+        return super().read(size)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_chunks_at_same_offset(user_client):
+    content = image_bytes()
+    upload = ChunkedUpload.objects.get(
+        pk=start(user_client, content)['token'])
+    middle = len(content) // 2
+    append_chunk(upload, 0, SlowClient(content[:middle]), middle)
+    stale = ChunkedUpload.objects.get(pk=upload.pk)
+    stale.received = 0
+    with pytest.raises(OffsetMismatch):
+        append_chunk(stale, 0, SlowClient(content[:middle]), middle)
+    upload.refresh_from_db()
+    assert upload.received == middle, (
+        "Убедитесь, что из двух фрагментов с одним смещением"
+        " засчитывается только первый."
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_upload_survives_retried_transaction(
+        user_client, published_category, monkeypatch, settings):
+    # The rerun repeats every query of the first attempt
+    settings.QUERY_BUDGET_RAISE = False
+    monkeypatch.setattr(db.time, 'sleep', lambda pause: None)
+    content = image_bytes()
+    token = start(user_client, content)['token']
+    put_chunk(user_client, token, 0, content)
+    attempts = []
+
+    def lock_once(sender, instance, **kwargs):
+        attempts.append(instance.pk)
+        if len(attempts) == 1:
+            raise OperationalError('database is locked')
+
+    post_save.connect(lock_once, sender=Post)
+    try:
+        response = user_client.post('/posts/create/', {
+            'title': 'Заголовок', 'text': 'Текст', 'upload': token,
+            'pub_date': timezone.now().strftime('%Y-%m-%dT%H:%M'),
+            'category': published_category.pk,
+        })
+    finally:
+        post_save.disconnect(lock_once, sender=Post)
+    assert response.status_code == 302 and len(attempts) > 1, (
+        "Убедитесь, что публикация с загрузкой сохраняется, когда"
+        " транзакция повторяется из-за блокировки базы данных."
+    )
+    assert Post.objects.get().image.read() == content
+    assert not ChunkedUpload.objects.exists() and not any(
+        Path(settings.CHUNKED_UPLOAD_ROOT).glob(f'{token}.part')), (
+        "Убедитесь, что временный файл загрузки удаляется после"
+        " сохранения публикации."
+    )
@@ -0,0 +1,110 @@
+import pytest
+from django.core.cache import caches
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+
+from conftest import get_in_thread
+from users.backends import snapshot_key
+
+URL = '/pages/about/'
+MODEL_BACKEND = 'django.contrib.auth.backends.ModelBackend'
+
+# the snapshot is dropped once the change is committed
+pytestmark = [pytest.mark.django_db(transaction=True)]
+
+
+@pytest.fixture(autouse=True)
+def cached_users(settings):
+    """The backend is enabled only with memcached, see settings"""
+    settings.AUTHENTICATION_BACKENDS = [
+        'users.backends.CachedUserBackend', MODEL_BACKEND]
+
+
+def test_user_is_loaded_from_cache(user_client, user):
+    user_client.get(URL)
+    with CaptureQueriesContext(connection) as queries:
+        response = user_client.get(URL)
+    assert response.wsgi_request.user == user
+    assert not [query for query in queries
+                if 'auth_user' in query['sql']], (
+        "Убедитесь, что пользователь авторизованного запроса берётся из"
+        " кэша."
+    )
+    assert caches['shared'].get(snapshot_key(user.pk)) is not None, (
+        "Убедитесь, что пользователь кэшируется в общем для всех процессов"
+        " кэше."
+    )
+    assert user.password not in caches['shared'].get(
+        snapshot_key(user.pk)), (
+        "Убедитесь, что хеш пароля не хранится в кэше пользователей."
+    )
+
+
+def test_model_backend_sessions_stay_valid(user):
+    client = Client()
+    client.force_login(user, backend=MODEL_BACKEND)
+    response = client.get(URL)
+    assert response.wsgi_request.user == user, (
+        "Убедитесь, что сессии, начатые с `ModelBackend`, остаются"
+        " действительными."
+    )
+
+
+def test_profile_edit_refreshes_user(user_client, user):
+    user_client.get(URL)
+    user_client.post('/profile/edit/', {
+        'username': user.username, 'email': 'new@example.com',
+        'first_name': 'Новое', 'last_name': 'Имя'})
+    response = user_client.get(URL)
+    assert response.wsgi_request.user.first_name == 'Новое', (
+        "Убедитесь, что после редактирования профиля пользователь"
+        " загружается заново."
+    )
+
+
+def test_password_change_logs_out(user_client, user):
+    user_client.get(URL)
+    user.set_password('new-password-123')
+    user.save()
+    response = user_client.get(URL)
+    assert not response.wsgi_request.user.is_authenticated, (
+        "Убедитесь, что смена пароля сбрасывает кэш пользователя и"
+        " завершает старые сессии."
+    )
+
+
+def test_password_change_read_before_commit(user_client, user):
+    user_client.get(URL)
+    with transaction.atomic():
+        user.set_password('new-password-123')
+        user.save()
+        response = get_in_thread(user_client, URL)
+        assert response.wsgi_request.user.is_authenticated
+    response = user_client.get(URL)
+    assert not response.wsgi_request.user.is_authenticated, (
+        "Убедитесь, что кэш пользователя сбрасывается после фиксации"
+        " транзакции: запрос до неё не должен вернуть в кэш старый пароль."
+    )
+
+
+def test_password_change_form_with_cached_user(user):
+    user.set_password('old-password-123')
+    user.save()
+    client = Client()
+    client.force_login(user)
+    client.get(URL)
+    response = client.post('/auth/password_change/', {
+        'old_password': 'old-password-123',
+        'new_password1': 'new-password-456',
+        'new_password2': 'new-password-456'})
+    assert response.status_code == 302, (
+        "Убедитесь, что пароль пользователя из кэша можно сменить."
+    )
+    response = client.get(URL)
+    assert response.wsgi_request.user.is_authenticated, (
+        "Убедитесь, что после смены пароля текущая сессия остаётся"
+        " действительной."
+    )
+    user.refresh_from_db()
+    assert user.check_password('new-password-456')
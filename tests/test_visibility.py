@@ -0,0 +1,83 @@
+from datetime import timedelta
+from io import StringIO
+from pathlib import Path
+
+import pytest
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog.models import Category, Post
+from blog.visibility import sync_category_visibility
+
+
+# posts are updated once the category change is committed
+@pytest.mark.django_db(transaction=True)
+def test_category_toggle_updates_posts(
+        mixer, user, published_category):
+    posts = mixer.cycle(5).blend(
+        'blog.Post', author=user, category=published_category,
+        is_published=True, pub_date=timezone.now() - timedelta(days=1))
+    assert all(post.is_visible for post in posts)
+
+    published_category.is_published = False
+    published_category.save()
+    assert not Post.objects.filter(is_visible=True).exists(), (
+        "Убедитесь, что снятие категории с публикации скрывает её посты."
+    )
+
+    published_category.is_published = True
+    published_category.save()
+    assert Post.objects.filter(is_visible=True).count() == len(posts), (
+        "Убедитесь, что публикация категории снова показывает её посты."
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_sync_works_in_batches(mixer, user, published_category):
+    mixer.cycle(5).blend(
+        'blog.Post', author=user, category=published_category,
+        is_published=True, pub_date=timezone.now() - timedelta(days=1))
+    Post.objects.update(is_visible=False)
+    with CaptureQueriesContext(connection) as queries:
+        updated = sync_category_visibility(published_category.pk,
+                                           batch_size=2)
+    assert updated == 5
+    assert Post.objects.filter(is_visible=True).count() == 5
+    assert len([query for query in queries
+                if query['sql'].startswith('UPDATE')]) == 3, (
+        "Убедитесь, что посты категории обновляются пачками"
+        " ограниченного размера."
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_worker_hides_posts_of_hidden_category(
+        mixer, user, published_category):
+    mixer.cycle(5).blend(
+        'blog.Post', author=user, category=published_category,
+        is_published=True, pub_date=timezone.now() - timedelta(days=1))
+    # the process changing the category stopped before updating posts
+    Category.objects.filter(pk=published_category.pk).update(
+        is_published=False)
+    call_command('publish_scheduled', '--batch-size=2', stdout=StringIO())
+    assert not Post.objects.filter(is_visible=True).exists(), (
+        "Убедитесь, что команда `publish_scheduled` скрывает посты"
+        " снятых с публикации категорий."
+    )
+
+
+@pytest.mark.django_db
+def test_seed_fixture_loads(client):
+    fixture = Path(settings.BASE_DIR) / 'db.json'
+    call_command('loaddata', fixture, stdout=StringIO())
+    assert Post.objects.exists() and not Post.objects.filter(
+        is_visible=False, is_published=True,
+        pub_date__lte=timezone.now(), category__is_published=True
+    ).exists(), (
+        "Убедитесь, что публикации из `db.json` видны на сайте сразу"
+        " после загрузки."
+    )
+    assert client.get('/').status_code == 200